@@ -1,4 +1,7 @@
+import os
+import sys
 import time
+from pathlib import Path
 import numpy as np
 import cv2
 
@@ -6,9 +9,13 @@ import gi
 gi.require_version("Gst", "1.0")
 from gi.repository import Gst
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from common.rtp import receiver_pipeline
+
 # --------- CONFIG ----------
 PORT = 5004
 W, H = 1280, 720
+CODEC = os.getenv("RTP_CODEC", "jpeg")  # jpeg | h264 | h265, as sent by the gateway
 # --------------------------
 
 
@@ -19,12 +26,7 @@ W, H = 1280, 720
 Gst.init(None)
 
 
-pipeline_str = (
-    f"udpsrc port={PORT} caps=application/x-rtp,payload=26 ! "
-    f"rtpjpegdepay ! jpegdec ! "
-    f"video/x-raw,format=BGR ! "
-    f"appsink name=sink sync=false drop=true max-buffers=1"
-)
+pipeline_str = receiver_pipeline(CODEC, PORT, "appsink name=sink sync=false drop=true max-buffers=1")
 
 
 pipeline = Gst.parse_launch(pipeline_str)
@@ -0,0 +1,36 @@
+from .control_link import ACK_TYPE, AckTracker, DedupeWindow, decode_control, make_ack
+from .control_msg import INTENT_TYPES, is_control_msg, pack_control_msg, unpack_control_msg
+from .frame_msg import (
+    FRAME_TOPIC_PREFIX,
+    FrameMsg,
+    encode_shm_name,
+    frame_topic,
+    pack_frame_msg,
+    recv_frame_msg,
+    recv_latest_frame_msg,
+    send_frame_msg,
+    unpack_frame_msg,
+    validate_topic,
+)
+
+__all__ = [
+    "ACK_TYPE",
+    "AckTracker",
+    "DedupeWindow",
+    "decode_control",
+    "make_ack",
+    "INTENT_TYPES",
+    "is_control_msg",
+    "pack_control_msg",
+    "unpack_control_msg",
+    "FRAME_TOPIC_PREFIX",
+    "FrameMsg",
+    "encode_shm_name",
+    "frame_topic",
+    "pack_frame_msg",
+    "recv_frame_msg",
+    "recv_latest_frame_msg",
+    "send_frame_msg",
+    "unpack_frame_msg",
+    "validate_topic",
+]
@@ -0,0 +1,208 @@
+"""Sequencing, ACK and bounded retransmit for GCS -> gateway control intents over UDP.
+
+Every intent the GCS sends carries ``session`` (random per publisher run)
+and ``seq`` (per-session counter). The gateway ACKs every sequenced intent,
+including duplicates, so a lost ACK is repaired by the retransmit it causes
+("re-send ACK if command already applied", docs/gcs_ui_architecture_final.md
+§6.1). It executes a (session, seq) at most once, using ``DedupeWindow``.
+
+On the air intents and ACKs use the binary format of ``control_msg.py``
+(JSON is still accepted, and answered in JSON). ACK (gateway -> sender
+address, same UDP flow), shown as a dict::
+
+    {"type": "ACK", "session": s, "seq": n, "t_rx": <gateway time.time()>, "dup": bool}
+
+The publisher measures the round trip of every intent from its first send
+to the first ACK. Reliable intents (non-idempotent commands) stay pending
+and are resent on an RTO derived from the measured RTT (RFC 6298 style),
+doubling per try, at most ``max_tries`` sends. Latest-wins intents (ROI,
+RATE_BUDGET) are sent once: a newer one supersedes a lost one, and
+retransmitting stale values would only cost airtime.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, NamedTuple, Optional
+
+from .control_msg import is_control_msg, pack_control_msg, unpack_control_msg
+
+ACK_TYPE = "ACK"
+
+
+def make_ack(session: int, seq: int, t_rx: float, dup: bool, binary: bool = False) -> bytes:
+    """ACK in the sender's format: binary (control_msg) if its intent was binary, else JSON."""
+    ack = {"type": ACK_TYPE, "session": session, "seq": seq, "t_rx": t_rx, "dup": dup}
+    return pack_control_msg(ack) if binary else json.dumps(ack).encode()
+
+
+def decode_control(payload: bytes) -> Optional[dict]:
+    """Binary or JSON datagram -> intent/ACK dict; None if it is neither."""
+    try:
+        msg = unpack_control_msg(payload) if is_control_msg(payload) else json.loads(payload)
+    except ValueError:
+        return None
+    return msg if isinstance(msg, dict) else None
+
+
+class SeqWindow:
+    """The last ``size`` sequence numbers of one session."""
+
+    __slots__ = ("size", "highest", "seen")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.highest = -1
+        self.seen = set()
+
+    def accept(self, seq: int) -> bool:
+        if seq <= self.highest - self.size or seq in self.seen:
+            return False
+        self.seen.add(seq)
+        if seq > self.highest:
+            self.highest = seq
+            floor = seq - self.size
+            if len(self.seen) > 2 * self.size:
+                self.seen = {s for s in self.seen if s > floor}
+        return True
+
+
+class DedupeWindow:
+    """At-most-once filter over the last ``size`` sequence numbers of each (session, sender).
+
+    Several publishers can be active at once (e.g. two GCS), so every
+    session keeps its own window; the ``max_sessions`` least recently seen
+    are kept. A seq that has fallen out of its window is treated as a
+    duplicate: it is older than anything the sender could still be
+    retransmitting.
+    """
+
+    def __init__(self, size: int = 1024, max_sessions: int = 16):
+        self.size = size
+        self.max_sessions = max_sessions
+        self.windows: "OrderedDict[tuple, SeqWindow]" = OrderedDict()
+        self.duplicates = 0
+
+    def accept(self, session: int, seq: int, sender: Hashable = None) -> bool:
+        """True the first time (session, seq) is seen from ``sender``."""
+        key = (session, sender)
+        window = self.windows.get(key)
+        if window is None:
+            window = self.windows[key] = SeqWindow(self.size)
+            if len(self.windows) > self.max_sessions:
+                self.windows.popitem(last=False)
+        else:
+            self.windows.move_to_end(key)
+        if not window.accept(seq):
+            self.duplicates += 1
+            return False
+        return True
+
+
+class Pending(NamedTuple):
+    payload: bytes
+    kind: str
+    t_first: float
+    t_next: float
+    tries: int
+    reliable: bool
+
+
+class RttStats:
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = self.max = self.last = 0.0
+
+    def add(self, rtt: float):
+        self.count += 1
+        self.total += rtt
+        self.max = max(self.max, rtt)
+        self.last = rtt
+
+    def format(self) -> str:
+        mean = self.total / self.count if self.count else 0.0
+        return f"rtt {mean * 1e3:.1f}/{self.max * 1e3:.1f} ms (n={self.count})"
+
+
+class AckTracker:
+    """Publisher side: sequence numbers, RTT per command, and bounded retransmit."""
+
+    def __init__(self, session: int, min_rto: float = 0.05, max_rto: float = 1.0, max_tries: int = 5,
+                 binary: bool = True):
+        self.session = session
+        self.binary = binary
+        self.next_seq = 0
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.max_tries = max_tries
+        self.srtt = None
+        self.rttvar = 0.0
+        self.pending: Dict[int, Pending] = {}
+        self.rtt: Dict[str, RttStats] = {}
+
+        self.sent = 0
+        self.retransmits = 0
+        self.acked = 0
+        self.failed = 0        # reliable intents never ACKed after max_tries
+        self.unacked = 0       # best-effort intents whose ACK never came
+
+    @property
+    def rto(self) -> float:
+        if self.srtt is None:
+            return self.max_rto / 2
+        return min(max(self.srtt + 4 * self.rttvar, self.min_rto), self.max_rto)
+
+    def stamp(self, intent: dict, reliable: bool, now: Optional[float] = None) -> bytes:
+        """Adds session/seq to the intent, remembers it, returns the datagram to send."""
+        now = time.monotonic() if now is None else now
+        seq = self.next_seq
+        self.next_seq += 1
+        intent = dict(intent, session=self.session, seq=seq)
+        payload = pack_control_msg(intent) if self.binary else json.dumps(intent).encode()
+        self.pending[seq] = Pending(payload, str(intent.get("type")), now, now + self.rto, 1, reliable)
+        self.sent += 1
+        return payload
+
+    def on_ack(self, ack: dict, now: Optional[float] = None) -> Optional[float]:
+        """Returns the command's RTT (first send -> this ACK), or None for a stale/foreign ACK."""
+        if ack.get("session") != self.session:
+            return None
+        entry = self.pending.pop(ack.get("seq"), None)
+        if entry is None:
+            return None            # already ACKed (duplicate ACK) or given up
+        now = time.monotonic() if now is None else now
+        rtt = now - entry.t_first
+        self.acked += 1
+        self.rtt.setdefault(entry.kind, RttStats()).add(rtt)
+        if entry.tries == 1:       # Karn: only unambiguous samples feed the RTO
+            if self.srtt is None:
+                self.srtt, self.rttvar = rtt, rtt / 2
+            else:
+                self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+                self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        return rtt
+
+    def due(self, now: Optional[float] = None) -> List[bytes]:
+        """Datagrams to resend now; drops intents that are out of tries (or best effort)."""
+        now = time.monotonic() if now is None else now
+        resend = []
+        for seq, entry in list(self.pending.items()):
+            if entry.t_next > now:
+                continue
+            if not entry.reliable:
+                del self.pending[seq]
+                self.unacked += 1
+            elif entry.tries >= self.max_tries:
+                del self.pending[seq]
+                self.failed += 1
+            else:
+                backoff = min(self.rto * (2 ** entry.tries), self.max_rto)
+                self.pending[seq] = entry._replace(t_next=now + backoff, tries=entry.tries + 1)
+                self.retransmits += 1
+                resend.append(entry.payload)
+        return resend
+
+    def next_deadline(self) -> Optional[float]:
+        return min((e.t_next for e in self.pending.values()), default=None)
@@ -0,0 +1,139 @@
+"""Compact binary wire format for control intents and their ACKs (GCS <-> gateway UDP).
+
+Replaces JSON on the radio link: a sequenced ``RATE_BUDGET`` is 19 bytes
+instead of ~90. Both ends still work with the intent dict
+(``{"type", "value", "t_backend", "session", "seq"}``); only the bytes on
+the air change. JSON datagrams are still accepted (``is_control_msg``
+tells them apart by the first byte, never ``{``).
+
+Layout (little endian)::
+
+    marker   u8   0xC1 = control message v1 (version lives in the marker)
+    type     u8   INTENT_TYPES id; 0 = named type, name follows the header
+    flags    u8   bits 0-2 value kind, bit 3 ACK duplicate, bit 4 sequenced
+    session  u32  (0 if not sequenced)
+    seq      u32
+    t_ms     u32  sender wall clock, ms mod 2^32 (t_backend / ACK t_rx)
+    [name    u8 length + ASCII]          type 0 only
+    value    none | i32 | f32 | u8 length + UTF-8
+
+``t_ms`` wraps every ~49 days; the receiver restores the full time as the
+nearest match to its own clock, so only the clock offset between the two
+machines (not the wrap) limits its accuracy. Floats travel as f32 (about 7
+significant digits), enough for budgets and gimbal rates.
+"""
+
+import struct
+import time
+
+CONTROL_MSG_MARKER = 0xC1
+
+# marker, type, flags, session, seq, t_ms
+CONTROL_MSG_HEADER = struct.Struct("<BBBIII")
+
+# Append only: ids are on the wire
+INTENT_TYPES = {
+    "ACK": 1,
+    "HELLO": 2,
+    "RATE_BUDGET": 3,
+    "ROI": 4,
+    "RTP_DEST_ADD": 5,
+    "RTP_DEST_REMOVE": 6,
+}
+INTENT_NAMES = {v: k for k, v in INTENT_TYPES.items()}
+
+VALUE_NONE, VALUE_INT, VALUE_FLOAT, VALUE_STR = range(4)
+VALUE_MASK = 0x07
+FLAG_DUP = 0x08
+FLAG_SEQ = 0x10
+
+_I32 = struct.Struct("<i")
+_F32 = struct.Struct("<f")
+_WRAP_MS = 1 << 32
+
+
+def is_control_msg(payload: bytes) -> bool:
+    return len(payload) >= CONTROL_MSG_HEADER.size and payload[0] == CONTROL_MSG_MARKER
+
+
+def _pack_value(value):
+    if value is None:
+        return VALUE_NONE, b""
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int) and -(1 << 31) <= value < (1 << 31):
+        return VALUE_INT, _I32.pack(value)
+    if isinstance(value, (int, float)):
+        return VALUE_FLOAT, _F32.pack(value)
+    raw = str(value).encode("utf-8")
+    if len(raw) > 255:
+        raise ValueError(f"control value longer than 255 bytes: {value!r}")
+    return VALUE_STR, bytes((len(raw),)) + raw
+
+
+def pack_control_msg(intent: dict) -> bytes:
+    """Intent dict (``type`` required; ``value``, ``t_backend``/``t_rx``, ``session``, ``seq``, ``dup``) -> bytes."""
+    kind = intent["type"]
+    type_id = INTENT_TYPES.get(kind, 0)
+    name = b""
+    if type_id == 0:
+        raw = str(kind).encode("ascii")
+        if len(raw) > 255:
+            raise ValueError(f"intent type name too long: {kind!r}")
+        name = bytes((len(raw),)) + raw
+    value_kind, value = _pack_value(intent.get("value"))
+    seq = intent.get("seq")
+    flags = value_kind | (FLAG_DUP if intent.get("dup") else 0) | (FLAG_SEQ if seq is not None else 0)
+    t = intent.get("t_rx" if kind == "ACK" else "t_backend")
+    t_ms = int(t * 1000) % _WRAP_MS if t else 0
+    header = CONTROL_MSG_HEADER.pack(CONTROL_MSG_MARKER, type_id, flags,
+                                     intent.get("session") or 0, seq or 0, t_ms)
+    return header + name + value
+
+
+def _unwrap_ms(t_ms: int, now: float) -> float:
+    now_ms = int(now * 1000)
+    delta = (now_ms - t_ms) % _WRAP_MS
+    if delta >= _WRAP_MS // 2:
+        delta -= _WRAP_MS          # sender clock ahead of ours
+    return (now_ms - delta) / 1000
+
+
+def unpack_control_msg(payload: bytes, now: float = None) -> dict:
+    """bytes -> intent dict, the same keys a JSON intent/ACK has. Raises ValueError if malformed."""
+    if not is_control_msg(payload):
+        raise ValueError("not a v1 control message")
+    _, type_id, flags, session, seq, t_ms = CONTROL_MSG_HEADER.unpack_from(payload)
+    pos = CONTROL_MSG_HEADER.size
+    try:
+        if type_id == 0:
+            n = payload[pos]
+            kind = payload[pos + 1:pos + 1 + n].decode("ascii")
+            pos += 1 + n
+        else:
+            kind = INTENT_NAMES[type_id]
+
+        value_kind = flags & VALUE_MASK
+        if value_kind == VALUE_NONE:
+            value = None
+        elif value_kind == VALUE_INT:
+            value = _I32.unpack_from(payload, pos)[0]
+        elif value_kind == VALUE_FLOAT:
+            value = _F32.unpack_from(payload, pos)[0]
+        elif value_kind == VALUE_STR:
+            n = payload[pos]
+            value = payload[pos + 1:pos + 1 + n].decode("utf-8")
+        else:
+            raise ValueError(f"unknown value kind {value_kind}")
+    except (IndexError, KeyError, UnicodeDecodeError, struct.error) as e:
+        raise ValueError(f"malformed control message: {e!r}") from None
+
+    t = _unwrap_ms(t_ms, time.time() if now is None else now) if t_ms else None
+    intent = {"type": kind, "value": value}
+    if flags & FLAG_SEQ:
+        intent.update(session=session, seq=seq)
+    if kind == "ACK":
+        intent.update(t_rx=t, dup=bool(flags & FLAG_DUP))
+    else:
+        intent["t_backend"] = t
+    return intent
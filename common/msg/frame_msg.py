@@ -0,0 +1,126 @@
+"""Per-frame notification published by the camera after each SHM commit.
+
+Wire format (ZMQ multipart, one message per committed frame):
+
+    frame 0: topic     b"camera.frame.<camera_id>"
+    frame 1: FrameMsg  fixed-layout little-endian struct (FRAME_MSG_STRUCT)
+
+The ring segment name travels in a fixed 32-byte field rather than a third
+frame: every extra multipart frame costs more than the struct itself.
+
+Subscribers filter by topic prefix: ``camera.frame.`` for every camera,
+``camera.frame.<camera_id>`` for one.
+"""
+
+import re
+import struct
+from typing import NamedTuple, Optional, Tuple
+
+FRAME_TOPIC_PREFIX = "camera.frame"
+FRAME_MSG_VERSION = 2
+
+SHM_NAME_BYTES = 32
+
+# version, pixfmt, slot, generation, frame_id, t_capture_ns, t_sensor_ns,
+# width, height, channels, stride, nbytes, shm_name
+FRAME_MSG_STRUCT = struct.Struct(f"<BBHIQqqIIIII{SHM_NAME_BYTES}s")
+
+TOPIC_RE = re.compile(r"^[A-Za-z0-9.]{1,64}$")
+
+
+class FrameMsg(NamedTuple):
+    version: int
+    pixfmt: int
+    slot: int
+    generation: int
+    frame_id: int
+    t_capture_ns: int   # host CLOCK_MONOTONIC, mapped from the camera clock when available
+    t_sensor_ns: int    # raw camera clock, 0 if none
+    width: int
+    height: int
+    channels: int
+    stride: int
+    nbytes: int         # valid payload bytes in the slot
+    shm_name: str
+
+
+def validate_topic(topic: str) -> str:
+    if not TOPIC_RE.match(topic):
+        raise ValueError(f"Invalid topic: {topic}")
+    return topic
+
+
+def frame_topic(camera_id: str) -> bytes:
+    return validate_topic(f"{FRAME_TOPIC_PREFIX}.{camera_id}").encode("ascii")
+
+
+def encode_shm_name(shm_name: str) -> bytes:
+    """Validate and encode a segment name for the fixed-size message field."""
+    raw = shm_name.encode("utf-8")
+    if len(raw) > SHM_NAME_BYTES:
+        raise ValueError(f"SHM name {shm_name!r} longer than {SHM_NAME_BYTES} bytes")
+    return raw
+
+
+def pack_frame_msg(pixfmt: int, slot: int, generation: int, frame_id: int,
+                   t_capture_ns: int, t_sensor_ns: int,
+                   width: int, height: int, channels: int, stride: int, nbytes: int,
+                   shm_name: bytes) -> bytes:
+    """``shm_name`` is the output of ``encode_shm_name`` (kept encoded by the publisher)."""
+    return FRAME_MSG_STRUCT.pack(
+        FRAME_MSG_VERSION, pixfmt, slot, generation, frame_id, t_capture_ns, t_sensor_ns,
+        width, height, channels, stride, nbytes, shm_name,
+    )
+
+
+def unpack_frame_msg(payload: bytes) -> FrameMsg:
+    if len(payload) != FRAME_MSG_STRUCT.size:
+        raise ValueError(f"frame message is {len(payload)} bytes, expected {FRAME_MSG_STRUCT.size}")
+    fields = FRAME_MSG_STRUCT.unpack(payload)
+    if fields[0] != FRAME_MSG_VERSION:
+        raise ValueError(f"frame message version {fields[0]} not supported")
+    return FrameMsg(*fields[:-1], fields[-1].rstrip(b"\0").decode("utf-8"))
+
+
+def send_frame_msg(socket, topic: bytes, payload: bytes):
+    socket.send_multipart((topic, payload))
+
+
+def recv_frame_msg(socket, flags: int = 0) -> Tuple[bytes, FrameMsg]:
+    """Receive one notification. Raises ValueError on a malformed message."""
+    parts = socket.recv_multipart(flags)
+    if len(parts) != 2:
+        raise ValueError(f"frame message has {len(parts)} parts, expected 2")
+    return parts[0], unpack_frame_msg(parts[1])
+
+
+def recv_latest_frame_msg(socket, flags: int = 0, topic: Optional[bytes] = None) -> Tuple[bytes, FrameMsg, int]:
+    """Receive every queued notification and return the newest, plus how many older ones it replaced.
+
+    Waits for the first message like ``recv_frame_msg`` (pass ``zmq.NOBLOCK``
+    in ``flags`` to raise ``zmq.Again`` instead); only the newest is unpacked.
+    For latest-only consumers: ZMQ_CONFLATE cannot be used, it does not
+    support multipart messages.
+
+    With ``topic``, messages on any other topic are discarded: ZMQ subscriptions
+    match by prefix, so ``camera.frame.cam0`` also receives ``camera.frame.cam01``.
+    """
+    import zmq
+
+    parts = None
+    skipped = 0
+    while True:
+        try:
+            newer = socket.recv_multipart(flags if parts is None else zmq.NOBLOCK)
+        except zmq.Again:
+            if parts is None:
+                raise
+            break
+        if topic is not None and newer[0] != topic:
+            continue
+        if parts is not None:
+            skipped += 1
+        parts = newer
+    if len(parts) != 2:
+        raise ValueError(f"frame message has {len(parts)} parts, expected 2")
+    return parts[0], unpack_frame_msg(parts[1]), skipped
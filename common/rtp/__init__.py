@@ -0,0 +1,11 @@
+from .fec import FEC_PORT_OFFSET, FecDecoder, FecEncoder
+from .frame_meta import META_PORT_OFFSET, FrameMeta, pack_frame_meta, rtp_timestamp, unpack_frame_meta
+from .pipelines import CODECS, EncoderOptions, receiver_pipeline, sender_pipeline
+from .roi_meta import RoiMeta, pack_roi_meta, unpack_roi_meta
+
+__all__ = [
+    "CODECS", "EncoderOptions", "receiver_pipeline", "sender_pipeline",
+    "FEC_PORT_OFFSET", "FecDecoder", "FecEncoder",
+    "META_PORT_OFFSET", "FrameMeta", "pack_frame_meta", "rtp_timestamp", "unpack_frame_meta",
+    "RoiMeta", "pack_roi_meta", "unpack_roi_meta",
+]
@@ -0,0 +1,228 @@
+"""Application-level XOR forward error correction for the RTP video packets.
+
+Losing one packet of an RTP/JPEG frame loses the whole frame, and the link
+is fail-fast (no retransmission, see ``docs/datalink.md``). With FEC on, the
+sender adds one parity packet per group of up to ``k`` consecutive RTP
+packets; the receiver can rebuild any single lost packet of a group.
+Overhead is 1/k (``RTP_FEC_K``: 4 = 25 %, 10 = 10 %).
+
+A group never spans frames: it is closed at the frame's last packet (RTP
+marker), so parity is sent right after the frame and recovery never waits
+for the next one.
+
+Parity goes to its own port (RTP port + ``FEC_PORT_OFFSET``), so receivers
+without FEC keep working on the plain RTP stream.
+
+Wire format (little endian, then the parity bytes):
+
+    magic "VSFC", version, count, base_seq (RTP seq of the group's first
+    packet), length XOR (of the packets' lengths), parity (XOR of the packets,
+    zero-padded to the longest)
+"""
+
+import struct
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+FEC_MAGIC = b"VSFC"
+FEC_VERSION = 1
+FEC_PORT_OFFSET = 4   # +1/+3 are left for RTCP, +2 is the frame meta
+
+# magic, version, count, base_seq, length xor
+FEC_HEADER = struct.Struct("<4sBBHH")
+
+SEQ_MOD = 1 << 16
+
+
+def rtp_seq(packet: bytes) -> int:
+    return (packet[2] << 8) | packet[3]
+
+
+def rtp_marker(packet: bytes) -> bool:
+    return len(packet) > 1 and bool(packet[1] & 0x80)
+
+
+def _xor_into(acc: np.ndarray, packet: bytes):
+    acc[:len(packet)] ^= np.frombuffer(packet, dtype=np.uint8)
+
+
+class FecEncoder:
+    """Feeds RTP packets in send order; returns the parity packets to send after them."""
+
+    def __init__(self, k: int, mtu: int = 1500):
+        if k < 2 or k > 255:
+            raise ValueError(f"RTP_FEC_K must be 2..255, got {k}")
+        self.k = k
+        self.parity = np.zeros(mtu, dtype=np.uint8)
+        self.count = 0
+        self.base_seq = 0
+        self.length_xor = 0
+        self.max_len = 0
+        self.groups = 0
+
+    def feed(self, packet: bytes):
+        """Returns [] or [parity packet] (group full, or the frame ended)."""
+        if len(packet) > len(self.parity):
+            self.parity = np.concatenate([self.parity, np.zeros(len(packet) - len(self.parity), np.uint8)])
+        if self.count == 0:
+            self.base_seq = rtp_seq(packet)
+        _xor_into(self.parity, packet)
+        self.length_xor ^= len(packet)
+        self.max_len = max(self.max_len, len(packet))
+        self.count += 1
+        if self.count == self.k or rtp_marker(packet):
+            return [self.flush()]
+        return []
+
+    def flush(self) -> bytes:
+        packet = (FEC_HEADER.pack(FEC_MAGIC, FEC_VERSION, self.count, self.base_seq, self.length_xor)
+                  + self.parity[:self.max_len].tobytes())
+        self.parity[:self.max_len] = 0
+        self.count = self.length_xor = self.max_len = 0
+        self.groups += 1
+        return packet
+
+
+class FecDecoder:
+    """Takes RTP and parity packets as they arrive; returns RTP packets in sequence order.
+
+    With no loss, packets pass straight through. After a gap, later packets
+    are held (at most ``max_hold`` seconds or ``max_held`` packets) until the
+    missing one is rebuilt from its group's parity, or the gap is known to be
+    unrecoverable, so the depayloader always sees packets in order.
+
+    RTP and parity arrive on different sockets, so a group's parity can be
+    read before its last RTP packets. Parity is therefore kept until its
+    group is complete (rebuilt if needed) or ``max_hold`` has passed since it
+    arrived; the rebuild is retried as late RTP packets come in.
+    """
+
+    def __init__(self, max_hold: float = 0.05, max_held: int = 256, history: int = 1024):
+        self.max_hold = max_hold
+        self.max_held = max_held
+        self.history = history
+        self.recent = OrderedDict()  # extended seq -> packet (for rebuilding), oldest first
+        self.held = {}            # extended seq -> packet, waiting for next_seq
+        self.groups = {}          # base extended seq -> (count, length xor, parity, arrival), unresolved
+        self.next_seq = None      # extended seq the receiver expects next
+        self.last_ext = None
+        self.resolved_upto = None  # gaps below this cannot be rebuilt any more
+        self.gap_since = 0.0
+
+        self.received = 0
+        self.fec_received = 0
+        self.recovered = 0
+        self.lost = 0             # packets given up on
+
+    def _extend(self, seq: int) -> int:
+        if self.last_ext is None:
+            self.last_ext = seq
+            return seq
+        delta = (seq - self.last_ext) % SEQ_MOD
+        if delta >= SEQ_MOD // 2:
+            delta -= SEQ_MOD      # older than the newest seen
+        ext = self.last_ext + delta
+        self.last_ext = max(self.last_ext, ext)
+        return ext
+
+    def on_rtp(self, packet: bytes):
+        """Returns the RTP packets now releasable, in order."""
+        self.received += 1
+        ext = self._extend(rtp_seq(packet))
+        if self.next_seq is None:
+            self.next_seq = ext
+        if ext < self.next_seq:
+            return []             # duplicate, or arrived after we gave up on it
+        self._remember(ext, packet)
+        self.held[ext] = packet
+        for base, group in list(self.groups.items()):
+            if base <= ext < base + group[0]:
+                self._try_group(base)
+        return self._release()
+
+    def on_fec(self, payload: bytes):
+        """Returns the RTP packets now releasable, in order (including any rebuilt one)."""
+        if len(payload) < FEC_HEADER.size:
+            return []
+        magic, version, count, base_seq, length_xor = FEC_HEADER.unpack_from(payload)
+        if magic != FEC_MAGIC or version != FEC_VERSION or self.last_ext is None:
+            return []
+        self.fec_received += 1
+        base = self._extend(base_seq)
+        if base not in self.groups:
+            self.groups[base] = (count, length_xor, payload[FEC_HEADER.size:], time.monotonic())
+            if len(self.groups) > self.max_held:
+                self._resolve(next(iter(self.groups)))
+            self._try_group(base)
+        return self._release()
+
+    def _try_group(self, base: int):
+        """Rebuilds the group's single missing packet if it can; resolves the group once it is settled."""
+        count, length_xor, parity, _ = self.groups[base]
+        group = range(base, base + count)
+        missing = [s for s in group if s not in self.recent]
+        if len(missing) > 1:
+            return                # wait for late packets (or max_hold)
+        if missing and missing[0] >= self.next_seq:
+            rebuilt = self._rebuild(parity, length_xor, [s for s in group if s != missing[0]])
+            if rebuilt is not None:
+                self.recovered += 1
+                self._remember(missing[0], rebuilt)
+                self.held[missing[0]] = rebuilt
+        self._resolve(base)
+
+    def _resolve(self, base: int):
+        end = base + self.groups.pop(base)[0]
+        self.resolved_upto = end if self.resolved_upto is None else max(self.resolved_upto, end)
+
+    def _pending(self, ext: int) -> bool:
+        return any(base <= ext < base + group[0] for base, group in self.groups.items())
+
+    def _rebuild(self, parity: bytes, length_xor: int, present):
+        acc = np.frombuffer(parity, dtype=np.uint8).copy()
+        length = length_xor
+        for s in present:
+            packet = self.recent[s]
+            if len(packet) > len(acc):
+                return None
+            _xor_into(acc, packet)
+            length ^= len(packet)
+        if length == 0 or length > len(acc):
+            return None
+        return acc[:length].tobytes()
+
+    def _remember(self, ext: int, packet: bytes):
+        self.recent[ext] = packet
+        if len(self.recent) > self.history:
+            self.recent.popitem(last=False)
+
+    def _release(self):
+        out = []
+        while True:
+            while self.next_seq in self.held:
+                out.append(self.held.pop(self.next_seq))
+                self.next_seq += 1
+                self.gap_since = 0.0
+            if not self.held:
+                return out
+            # Gap at next_seq with later packets waiting
+            now = time.monotonic()
+            if not self.gap_since:
+                self.gap_since = now
+            for base, group in list(self.groups.items()):
+                if now - group[3] > self.max_hold:
+                    self._resolve(base)   # more than one packet of it never came
+            pending = self._pending(self.next_seq)
+            if not pending and self.resolved_upto is not None and self.next_seq < self.resolved_upto:
+                self.lost += 1    # its group's parity has been and gone: skip just this one
+                self.next_seq += 1
+                continue
+            if (now - self.gap_since > self.max_hold and not pending) or len(self.held) > self.max_held:
+                first = min(self.held)  # parity lost too: give up on the whole gap
+                self.lost += first - self.next_seq
+                self.next_seq = first
+                self.gap_since = 0.0
+                continue
+            return out
@@ -0,0 +1,64 @@
+"""Per-frame identity side channel: frame_id and capture time, keyed by RTP timestamp.
+
+RTP/JPEG (and H.26x) carry neither the camera ``frame_id`` nor when the
+frame was captured. The gateway sends one small UDP datagram per frame to
+every receiver, on that receiver's RTP port + ``META_PORT_OFFSET``, naming
+the RTP timestamp the frame's packets carry; the receiver joins it to the
+decoded frame by that timestamp, which gives age-of-frame and per-frame_id
+loss accounting.
+
+The RTP timestamp is computable at the sender because it sets the
+payloader's ``timestamp-offset`` (random per run) and stamps each buffer's
+PTS itself: ``rtp_ts = offset + PTS * 90000 / 1e9`` (``rtp_timestamp``).
+
+``t_capture_unix_ns`` is the capture time on the realtime clock of the
+camera/gateway host, so the age computed at the GCS is only as good as the
+clock sync between the two machines (chrony/PTP).
+
+In ROI mode the frame's ``RoiMeta`` datagram is appended, so geometry and
+identity arrive together.
+"""
+
+import struct
+from typing import NamedTuple, Optional
+
+from .roi_meta import RoiMeta, pack_roi_meta, unpack_roi_meta
+
+FRAME_META_MAGIC = b"VSFM"
+FRAME_META_VERSION = 1
+FLAG_ROI = 0x01
+META_PORT_OFFSET = 2   # from each destination's RTP port; FEC parity is at +4
+
+RTP_CLOCK_RATE = 90000
+
+# magic, version, flags, pad, rtp_ts, frame_id, t_capture_unix_ns [+ RoiMeta datagram]
+FRAME_META_STRUCT = struct.Struct("<4sBB2xIQQ")
+
+
+class FrameMeta(NamedTuple):
+    frame_id: int
+    rtp_ts: int
+    t_capture_unix_ns: int        # 0 = unknown
+    roi: Optional[RoiMeta] = None
+
+
+def rtp_timestamp(pts_ns: int, offset: int, clock_rate: int = RTP_CLOCK_RATE) -> int:
+    """RTP timestamp the payloader gives a buffer with this PTS (running time from 0)."""
+    return (offset + pts_ns * clock_rate // 1_000_000_000) & 0xFFFFFFFF
+
+
+def pack_frame_meta(meta: FrameMeta) -> bytes:
+    flags = FLAG_ROI if meta.roi is not None else 0
+    head = FRAME_META_STRUCT.pack(FRAME_META_MAGIC, FRAME_META_VERSION, flags,
+                                  meta.rtp_ts, meta.frame_id, meta.t_capture_unix_ns)
+    return head + pack_roi_meta(meta.roi) if meta.roi is not None else head
+
+
+def unpack_frame_meta(payload: bytes) -> FrameMeta:
+    if len(payload) < FRAME_META_STRUCT.size:
+        raise ValueError(f"frame meta is {len(payload)} bytes, expected at least {FRAME_META_STRUCT.size}")
+    magic, version, flags, rtp_ts, frame_id, t_capture = FRAME_META_STRUCT.unpack_from(payload)
+    if magic != FRAME_META_MAGIC or version != FRAME_META_VERSION:
+        raise ValueError("not a v1 frame meta datagram")
+    roi = unpack_roi_meta(payload[FRAME_META_STRUCT.size:]) if flags & FLAG_ROI else None
+    return FrameMeta(frame_id, rtp_ts, t_capture, roi)
@@ -0,0 +1,114 @@
+"""GStreamer launch strings for the RTP video link, sender and receivers.
+
+The gateway sends, the GCS and the desktop viewer receive; keeping both ends
+here means a codec choice (``RTP_CODEC``) can only ever be configured in
+matching pairs.
+
+    jpeg   appsrc (JPEG)    ! rtpjpegpay       pt 26   (default)
+    h264   appsrc (raw BGR) ! x264enc          pt 96   plugins-ugly
+    h265   appsrc (raw BGR) ! x265enc          pt 96   plugins-bad
+
+The H.26x encoders are tuned for latency: no B-frames/lookahead
+(``tune=zerolatency``), a bounded keyframe interval so a receiver that joins
+or loses packets recovers quickly, and optional periodic intra refresh, which
+spreads the keyframe over many frames instead of one bitrate spike.
+"""
+
+from typing import NamedTuple
+
+CODECS = ("jpeg", "h264", "h265")
+
+JPEG_PT = 26
+H26X_PT = 96
+
+
+class EncoderOptions(NamedTuple):
+    bitrate_kbps: int = 8000
+    keyint: int = 30             # max frames between keyframes
+    intra_refresh: bool = False  # periodic intra refresh instead of IDR frames
+    speed_preset: str = "ultrafast"
+
+
+def check_codec(codec: str) -> str:
+    if codec not in CODECS:
+        raise ValueError(f"Unknown RTP_CODEC {codec!r} (expected one of {', '.join(CODECS)})")
+    return codec
+
+
+def appsrc_caps(codec: str, width: int, height: int, fps: int) -> str:
+    """Caps of the frames the sender pushes: JPEG bytes, or raw BGR for H.26x."""
+    if check_codec(codec) == "jpeg":
+        return f"image/jpeg,width={width},height={height},framerate={fps}/1"
+    return f"video/x-raw,format=BGR,width={width},height={height},framerate={fps}/1"
+
+
+def encoder_element(codec: str, opts: EncoderOptions) -> str:
+    if codec == "h264":
+        return (
+            f"x264enc name=enc tune=zerolatency speed-preset={opts.speed_preset} "
+            f"bitrate={opts.bitrate_kbps} key-int-max={opts.keyint} "
+            f"intra-refresh={'true' if opts.intra_refresh else 'false'} sliced-threads=true byte-stream=true ! "
+            f"video/x-h264,profile=baseline ! "
+            f"rtph264pay pt={H26X_PT} config-interval=-1 aggregate-mode=zero-latency"
+        )
+    if codec == "h265":
+        refresh = ' option-string="intra-refresh=1"' if opts.intra_refresh else ""
+        return (
+            f"x265enc name=enc tune=zerolatency speed-preset={opts.speed_preset} "
+            f"bitrate={opts.bitrate_kbps} key-int-max={opts.keyint}{refresh} ! "
+            f"rtph265pay pt={H26X_PT} config-interval=-1"
+        )
+    return f"rtpjpegpay pt={JPEG_PT}"
+
+
+def sender_pipeline(codec: str, width: int, height: int, fps: int,
+                    opts: EncoderOptions = EncoderOptions(), sink: str = "",
+                    do_timestamp: bool = True, timestamp_offset: int = -1) -> str:
+    """appsrc ``src`` -> [convert/encode] -> RTP payloader -> ``sink``.
+
+    ``fps`` 0 means variable frame rate. With ``do_timestamp`` False the
+    caller stamps each buffer's PTS (e.g. from capture time) and appsrc keeps it.
+    ``timestamp_offset`` >= 0 fixes the payloader's RTP timestamp base (-1 =
+    random), so the sender can compute each frame's RTP timestamp
+    (``frame_meta.rtp_timestamp``).
+    """
+    check_codec(codec)
+    convert = "" if codec == "jpeg" else "videoconvert ! video/x-raw,format=I420 ! "
+    # The payloader is the last element of encoder_element
+    offset = f" timestamp-offset={timestamp_offset}" if timestamp_offset >= 0 else ""
+    return (
+        f"appsrc name=src is-live=true block=false format=time "
+        f"do-timestamp={'true' if do_timestamp else 'false'} "
+        f"caps={appsrc_caps(codec, width, height, fps)} ! "
+        f"{convert}{encoder_element(codec, opts)}{offset} ! {sink}"
+    )
+
+
+def receiver_pipeline(codec: str, port: int, sink: str, appsrc: bool = False, decode: bool = True) -> str:
+    """udpsrc on ``port`` -> depay/decode -> BGR -> ``sink`` (e.g. an appsink).
+
+    The depayloader is named ``depay``, for a probe reading RTP headers.
+    With ``appsrc`` the RTP packets are pushed by the application instead
+    (appsrc ``rtpsrc``, e.g. after FEC recovery) and ``port`` is unused.
+    With ``decode`` False (jpeg only) ``sink`` gets the depayloaded JPEG
+    frames as sent, for serving them without a decode/re-encode.
+    """
+    if appsrc:
+        source = "appsrc name=rtpsrc is-live=true format=time do-timestamp=true"
+    else:
+        source = f"udpsrc port={port}"
+    if check_codec(codec) == "jpeg":
+        decoder = "jpegdec ! videoconvert ! video/x-raw,format=BGR ! " if decode else ""
+        return (
+            f"{source} caps=application/x-rtp,media=video,clock-rate=90000,encoding-name=JPEG,payload={JPEG_PT} ! "
+            f"rtpjpegdepay name=depay ! {decoder}{sink}"
+        )
+    if not decode:
+        raise ValueError(f"JPEG passthrough needs RTP_CODEC=jpeg, not {codec!r}")
+    name = codec.upper()
+    return (
+        f"{source} caps=application/x-rtp,media=video,clock-rate=90000,"
+        f"encoding-name={name},payload={H26X_PT} ! "
+        f"rtp{codec}depay name=depay ! {codec}parse ! avdec_{codec} ! "
+        f"videoconvert ! video/x-raw,format=BGR ! {sink}"
+    )
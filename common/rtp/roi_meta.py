@@ -0,0 +1,56 @@
+"""ROI geometry for composite (crop + context) video frames.
+
+In ROI mode the gateway sends one composite image per frame: the native
+resolution crop at (0, 0) and the downscaled full frame ("context") beside
+it. rtpjpegpay strips JPEG headers, so the geometry cannot ride in the image;
+it goes to the receiver appended to the frame's ``FrameMeta`` datagram
+(``frame_meta.py``), on the receiver's RTP port + 2 (``META_PORT_OFFSET``).
+
+All coordinates are pixels. ``src_*`` is the camera frame, ``roi_*`` the crop
+in camera pixels, ``ctx_*`` where the context image sits in the composite.
+"""
+
+import struct
+from typing import NamedTuple
+
+ROI_META_MAGIC = b"VSRI"
+ROI_META_VERSION = 1
+
+# magic, version, pad, frame_id, src_w, src_h, roi_x, roi_y, roi_w, roi_h, ctx_x, ctx_y, ctx_w, ctx_h
+ROI_META_STRUCT = struct.Struct("<4sB3xQ10I")
+
+
+class RoiMeta(NamedTuple):
+    frame_id: int
+    src_w: int
+    src_h: int
+    roi_x: int
+    roi_y: int
+    roi_w: int
+    roi_h: int
+    ctx_x: int
+    ctx_y: int
+    ctx_w: int
+    ctx_h: int
+
+    def roi_to_src(self, x: float, y: float):
+        """Composite pixel inside the crop -> camera pixel."""
+        return self.roi_x + x, self.roi_y + y
+
+    def ctx_to_src(self, x: float, y: float):
+        """Composite pixel inside the context image -> camera pixel."""
+        return ((x - self.ctx_x) * self.src_w / self.ctx_w,
+                (y - self.ctx_y) * self.src_h / self.ctx_h)
+
+
+def pack_roi_meta(meta: RoiMeta) -> bytes:
+    return ROI_META_STRUCT.pack(ROI_META_MAGIC, ROI_META_VERSION, *meta)
+
+
+def unpack_roi_meta(payload: bytes) -> RoiMeta:
+    if len(payload) != ROI_META_STRUCT.size:
+        raise ValueError(f"ROI meta is {len(payload)} bytes, expected {ROI_META_STRUCT.size}")
+    fields = ROI_META_STRUCT.unpack(payload)
+    if fields[0] != ROI_META_MAGIC or fields[1] != ROI_META_VERSION:
+        raise ValueError("not a v1 ROI meta datagram")
+    return RoiMeta(*fields[2:])
@@ -0,0 +1,7 @@
+from .frame_ring import PIXFMT_BGR8, PIXFMT_GRAY8, PIXFMT_JPEG, FrameRing, FrameRingWriter
+from .frame_reader import FrameReader, FrameView
+
+__all__ = [
+    "PIXFMT_BGR8", "PIXFMT_GRAY8", "PIXFMT_JPEG",
+    "FrameRing", "FrameRingWriter", "FrameReader", "FrameView",
+]
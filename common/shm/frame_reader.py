@@ -0,0 +1,160 @@
+"""Seqlock-validated reader for the camera frame ring.
+
+Zero-copy use (the caller finishes before the slot is reused):
+
+    view = reader.read(slot)
+    small = cv2.resize(view.image, (w, h))   # reads SHM directly
+    if not reader.is_valid(view):            # slot reused mid-read
+        drop(small)
+
+Copy use (the caller keeps or draws on the frame):
+
+    view = reader.read(slot, copy=True)      # None if every retry tore
+
+For PIXFMT_JPEG rings ``view.image`` is the 1-D compressed bitstream.
+"""
+
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+import numpy as np
+
+from .frame_ring import PIXFMT_JPEG, FrameRing
+
+
+@dataclass
+class FrameView:
+    image: np.ndarray   # read-only SHM view, or a private copy when read(copy=True)
+    slot: int
+    seq: int
+    frame_id: int
+    generation: int
+    t_capture_ns: int = 0
+    copied: bool = False
+    pixfmt: int = 0
+    width: int = 0      # decoded geometry (image.shape for raw formats)
+    height: int = 0
+
+
+class FrameReader:
+    """Attaches once to a frame ring and hands out validated frames."""
+
+    def __init__(self, shm_name: Optional[str] = None):
+        self.shm = None
+        self.ring = None
+        self.shm_name = None
+        self.reads = 0
+        self.torn_reads = 0
+        self.bad_slots = 0      # read(slot) with a slot the ring does not have
+        if shm_name:
+            self.attach(shm_name)
+
+    @property
+    def attached(self) -> bool:
+        return self.ring is not None
+
+    def attach(self, shm_name: str, generation: Optional[int] = None) -> bool:
+        """Map the segment, re-mapping if the camera retired or replaced it.
+
+        A no-op while the current mapping is still live (and matches
+        ``generation`` when given). Returns False if the segment does not
+        exist or is not initialized yet; the caller retries on the next frame.
+        """
+        ring = self.ring
+        if (ring is not None and shm_name == self.shm_name and not ring.retired()
+                and (generation is None or generation == ring.generation)):
+            return True
+
+        self.close()
+        self.shm_name = shm_name
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+        except FileNotFoundError:
+            return False
+        # The camera owns the segment; don't let our resource tracker unlink it on exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        try:
+            self.ring = FrameRing.from_buffer(shm.buf)
+        except RuntimeError:
+            shm.close()
+            return False
+        self.shm = shm
+        return True
+
+    def read(self, slot: Optional[int] = None, copy: bool = False, retries: int = 2) -> Optional[FrameView]:
+        """Return the frame in ``slot`` (default: latest committed slot).
+
+        Without ``copy`` the image is a read-only view into SHM; confirm it with
+        ``is_valid`` once done with it. With ``copy`` the frame is copied and
+        validated here, retrying on the latest slot if the copy tore.
+        Returns None if no consistent frame could be read, or if ``slot`` is
+        out of range for the ring (counted in ``bad_slots``).
+        """
+        if self.ring is None or self.ring.retired():
+            if self.shm_name is None:
+                raise RuntimeError("FrameReader.read() called before attach()")
+            if not self.attach(self.shm_name):
+                return None
+        ring = self.ring
+        if slot is not None and not 0 <= slot < ring.slot_count:
+            self.bad_slots += 1
+            return None
+
+        for _ in range(retries + 1):
+            if slot is None:
+                slot = ring.latest_slot()
+                if slot < 0:
+                    return None  # nothing committed yet
+
+            meta = ring.slots[slot]
+            seq = int(meta["seq"])
+            if seq & 1 == 0:
+                h, w, c = int(meta["height"]), int(meta["width"]), int(meta["channels"])
+                frame_id = int(meta["frame_id"])
+                t_capture_ns = int(meta["t_capture_ns"])
+                pixfmt = ring.pixfmt
+                if pixfmt == PIXFMT_JPEG:
+                    image = ring.payload[slot][:min(int(meta["nbytes"]), ring.slot_bytes)]
+                else:
+                    image = ring.pixels[slot][:h, :w, :c]
+
+                if not copy:
+                    if int(meta["seq"]) == seq:
+                        image = image.view()
+                        image.flags.writeable = False
+                        self.reads += 1
+                        return FrameView(image, slot, seq, frame_id, ring.generation, t_capture_ns,
+                                         pixfmt=pixfmt, width=w, height=h)
+                else:
+                    image = image.copy()
+                    if int(meta["seq"]) == seq:
+                        self.reads += 1
+                        return FrameView(image, slot, seq, frame_id, ring.generation, t_capture_ns,
+                                         copied=True, pixfmt=pixfmt, width=w, height=h)
+
+            # Writer is in (or went through) this slot: fall back to the newest one
+            self.torn_reads += 1
+            slot = None
+
+        return None
+
+    def is_valid(self, view: FrameView) -> bool:
+        """True if the slot behind ``view`` has not been rewritten since it was read."""
+        if view.copied:
+            return True
+        ring = self.ring
+        if (ring is not None and ring.generation == view.generation
+                and int(ring.slots[view.slot]["seq"]) == view.seq):
+            return True
+        self.torn_reads += 1
+        return False
+
+    def close(self):
+        self.ring = None
+        if self.shm is not None:
+            try:
+                self.shm.close()
+            except BufferError:
+                pass  # a caller still holds a view; the mapping is freed with it
+            self.shm = None
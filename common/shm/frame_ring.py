@@ -0,0 +1,331 @@
+"""Multi-slot frame ring in POSIX shared memory.
+
+Layout (little endian, every block 64-byte aligned):
+
+    [ring header][slot 0 header][slot 0 pixels][slot 1 header][slot 1 pixels]...
+
+The ring header is self-describing (magic, version, geometry, stride, pixel
+format, slot count, generation), so readers need no compile-time sizes. The
+segment is sized to the actual capture mode; when the camera changes mode it
+retires the segment (``FLAG_RETIRED``), unlinks it and creates a new one under
+the same name with ``generation + 1``. Readers that see the flag re-attach.
+Generations start from a per-process seed, so a camera that restarts without
+retiring its segment is still told apart by the generation in its frame messages.
+
+The camera is the single writer. It fills slots round-robin and guards each
+one with a seqlock (``seq`` is odd while the slot is being written, even once
+it is committed), then publishes the slot in ``latest_slot``. Readers never
+block the writer: they pick a committed slot, read it and re-check ``seq``.
+With N slots a reader has N-1 frame periods to finish before its slot is
+reused.
+"""
+
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+MAGIC = 0x52465356  # b"VSFR"
+VERSION = 1
+
+ALIGN = 64
+HEADER_BYTES = 64
+SLOT_HEADER_BYTES = 64
+
+FLAG_RETIRED = 0x1  # segment replaced; re-attach by name
+
+PIXFMT_GRAY8 = 1
+PIXFMT_BGR8 = 2
+PIXFMT_JPEG = 3  # compressed bitstream; slot ``nbytes`` holds its length
+
+_PIXFMT_BY_CHANNELS = {1: PIXFMT_GRAY8, 3: PIXFMT_BGR8}
+
+HEADER_DTYPE = np.dtype({
+    "names": [
+        "magic", "version", "header_bytes", "generation", "flags",
+        "slot_count", "latest_slot", "width", "height", "channels",
+        "stride", "pixfmt", "slot_bytes", "commit_count",
+    ],
+    "formats": [
+        "<u4", "<u2", "<u2", "<u4", "<u4",
+        "<u4", "<i4", "<u4", "<u4", "<u4",
+        "<u4", "<u4", "<u8", "<u8",
+    ],
+    "offsets": [
+        0, 4, 6, 8, 12,
+        16, 20, 24, 28, 32,
+        36, 40, 48, 56,
+    ],
+    "itemsize": HEADER_BYTES,
+})
+
+SLOT_DTYPE = np.dtype({
+    "names":   ["seq", "frame_id", "width", "height", "channels", "t_capture_ns", "t_sensor_ns", "nbytes"],
+    "formats": ["<u8", "<u8",      "<u4",   "<u4",    "<u4",      "<i8",          "<i8",         "<u8"],
+    "offsets": [0,     8,          16,      20,       24,         32,             40,            48],
+    "itemsize": SLOT_HEADER_BYTES,
+})
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def pixfmt_for_channels(channels: int) -> int:
+    try:
+        return _PIXFMT_BY_CHANNELS[channels]
+    except KeyError:
+        raise ValueError(f"unsupported channel count: {channels}") from None
+
+
+class FrameRing:
+    """Typed numpy views over a frame ring segment. Owns no memory."""
+
+    def __init__(self, buf, slot_count: int, width: int, height: int, channels: int,
+                 stride: int, slot_bytes: int):
+        self.slot_count = slot_count
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.stride = stride
+        self.slot_bytes = slot_bytes
+        self.slot_stride = _align(SLOT_HEADER_BYTES + slot_bytes)
+
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=buf)
+        self.slots = []
+        self.pixels = []
+        self.payload = []  # flat byte view of each slot, for encoded pixel formats
+        for i in range(slot_count):
+            base = HEADER_BYTES + i * self.slot_stride
+            self.slots.append(np.ndarray((), dtype=SLOT_DTYPE, buffer=buf, offset=base))
+            self.payload.append(np.ndarray(
+                (slot_bytes,), dtype=np.uint8, buffer=buf, offset=base + SLOT_HEADER_BYTES,
+            ))
+            self.pixels.append(np.ndarray(
+                (height, width, channels),
+                dtype=np.uint8,
+                buffer=buf,
+                offset=base + SLOT_HEADER_BYTES,
+                strides=(stride, channels, 1),
+            ))
+
+    @staticmethod
+    def segment_size(slot_count: int, slot_bytes: int) -> int:
+        return HEADER_BYTES + slot_count * _align(SLOT_HEADER_BYTES + slot_bytes)
+
+    @classmethod
+    def from_buffer(cls, buf):
+        """Map an existing segment using the geometry stored in its header.
+
+        Raises RuntimeError if the segment is not (yet) a valid frame ring.
+        """
+        if len(buf) < HEADER_BYTES:
+            raise RuntimeError("SHM segment too small for a frame ring header")
+        hdr = np.ndarray((), dtype=HEADER_DTYPE, buffer=buf)
+        if int(hdr["magic"]) != MAGIC:
+            raise RuntimeError("SHM segment is not an initialized frame ring")
+        if int(hdr["version"]) != VERSION:
+            raise RuntimeError(
+                f"frame ring version {int(hdr['version'])} not supported (expected {VERSION})"
+            )
+        ring = cls(
+            buf,
+            int(hdr["slot_count"]),
+            int(hdr["width"]),
+            int(hdr["height"]),
+            int(hdr["channels"]),
+            int(hdr["stride"]),
+            int(hdr["slot_bytes"]),
+        )
+        if cls.segment_size(ring.slot_count, ring.slot_bytes) > len(buf):
+            raise RuntimeError("frame ring header describes more memory than the segment holds")
+        return ring
+
+    @property
+    def generation(self) -> int:
+        return int(self.header["generation"])
+
+    @property
+    def pixfmt(self) -> int:
+        return int(self.header["pixfmt"])
+
+    def retired(self) -> bool:
+        return bool(int(self.header["flags"]) & FLAG_RETIRED)
+
+    def latest_slot(self) -> int:
+        return int(self.header["latest_slot"])
+
+    def slot_seq(self, slot: int) -> int:
+        return int(self.slots[slot]["seq"])
+
+
+class FrameRingWriter:
+    """Owns the ring segment and commits frames into it (single writer).
+
+    The segment is created on the first ``write`` (or ``allocate``) and sized
+    to that frame's geometry; a frame of different geometry retires it and
+    creates the next generation.
+    """
+
+    def __init__(self, name: str, slot_count: int):
+        if slot_count < 2:
+            raise ValueError(f"frame ring needs at least 2 slots, got {slot_count}")
+
+        self.name = name
+        self.slot_count = slot_count
+        self.shm = None
+        self.ring = None
+        # Seeded per process: a restarted camera that never set RETIRED still
+        # creates a generation no reader has seen, so readers re-map
+        self.generation = (time.time_ns() ^ (os.getpid() << 20)) & 0xFFFFFFFF
+        self.next_slot = 0
+
+    def allocate(self, width: int, height: int, channels: int, pixfmt: int = 0):
+        """(Re)create the segment for ``width`` x ``height`` x ``channels`` frames.
+
+        ``pixfmt`` defaults to the raw format for ``channels``. For PIXFMT_JPEG
+        the geometry is that of the decoded image and each slot holds up to one
+        raw frame's worth of compressed bytes.
+        """
+        if not pixfmt:
+            pixfmt = pixfmt_for_channels(channels)
+        self._release()
+
+        stride = width * channels
+        slot_bytes = stride * height
+        size = FrameRing.segment_size(self.slot_count, slot_bytes)
+
+        try:
+            self.shm = shared_memory.SharedMemory(create=True, name=self.name, size=size)
+        except FileExistsError:
+            old = shared_memory.SharedMemory(name=self.name)
+            old.unlink()
+            old.close()
+            self.shm = shared_memory.SharedMemory(create=True, name=self.name, size=size)
+        _ensure_shm_permissions(self.name)
+
+        self.generation = (self.generation + 1) & 0xFFFFFFFF
+        self.ring = FrameRing(self.shm.buf, self.slot_count, width, height, channels, stride, slot_bytes)
+        hdr = self.ring.header
+        hdr["version"] = VERSION
+        hdr["header_bytes"] = HEADER_BYTES
+        hdr["generation"] = self.generation
+        hdr["flags"] = 0
+        hdr["slot_count"] = self.slot_count
+        hdr["latest_slot"] = -1
+        hdr["width"] = width
+        hdr["height"] = height
+        hdr["channels"] = channels
+        hdr["stride"] = stride
+        hdr["pixfmt"] = pixfmt
+        hdr["slot_bytes"] = slot_bytes
+        hdr["commit_count"] = 0
+        for meta in self.ring.slots:
+            meta["seq"] = 0
+        hdr["magic"] = MAGIC  # last: readers treat the segment as valid from here on
+
+        self.next_slot = 0
+
+    def write(self, frame, frame_id: int, t_capture_ns: int = 0, t_sensor_ns: int = 0) -> int:
+        """Copy ``frame`` into the next slot and publish it. Returns the slot index.
+
+        ``t_capture_ns`` is the capture time on the host CLOCK_MONOTONIC;
+        ``t_sensor_ns`` the raw camera clock, 0 if the camera has none.
+        """
+        if frame.ndim == 2:
+            frame = frame[:, :, None]
+        h, w, c = frame.shape
+
+        ring = self.ring
+        if (ring is None or (w, h, c) != (ring.width, ring.height, ring.channels)
+                or ring.pixfmt == PIXFMT_JPEG):
+            self.allocate(w, h, c)
+            ring = self.ring
+
+        slot = self.next_slot
+        self.next_slot = (slot + 1) % ring.slot_count
+        meta = ring.slots[slot]
+
+        meta["seq"] += 1                # write start (odd)
+        self._write_meta(meta, frame_id, w, h, c, t_capture_ns, t_sensor_ns, h * ring.stride)
+        ring.pixels[slot][...] = frame
+        meta["seq"] += 1                # write complete (even)
+
+        self._publish(slot)
+        return slot
+
+    def write_encoded(self, data, width: int, height: int, channels: int, frame_id: int,
+                      t_capture_ns: int = 0, t_sensor_ns: int = 0, pixfmt: int = PIXFMT_JPEG) -> int:
+        """Store a compressed frame (e.g. the camera's own MJPEG) without decoding it.
+
+        ``width``/``height``/``channels`` describe the decoded image. Raises
+        ValueError if the bitstream does not fit a slot.
+        """
+        data = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data.reshape(-1)
+        n = data.shape[0]
+
+        ring = self.ring
+        if (ring is None or (width, height, channels) != (ring.width, ring.height, ring.channels)
+                or ring.pixfmt != pixfmt):
+            self.allocate(width, height, channels, pixfmt)
+            ring = self.ring
+        if n > ring.slot_bytes:
+            raise ValueError(f"encoded frame of {n} bytes exceeds slot capacity {ring.slot_bytes}")
+
+        slot = self.next_slot
+        self.next_slot = (slot + 1) % ring.slot_count
+        meta = ring.slots[slot]
+
+        meta["seq"] += 1                # write start (odd)
+        self._write_meta(meta, frame_id, width, height, channels, t_capture_ns, t_sensor_ns, n)
+        ring.payload[slot][:n] = data
+        meta["seq"] += 1                # write complete (even)
+
+        self._publish(slot)
+        return slot
+
+    @staticmethod
+    def _write_meta(meta, frame_id, w, h, c, t_capture_ns, t_sensor_ns, nbytes):
+        meta["frame_id"] = frame_id
+        meta["width"] = w
+        meta["height"] = h
+        meta["channels"] = c
+        meta["t_capture_ns"] = t_capture_ns
+        meta["t_sensor_ns"] = t_sensor_ns
+        meta["nbytes"] = nbytes
+
+    def _publish(self, slot: int):
+        self.ring.header["latest_slot"] = slot
+        self.ring.header["commit_count"] += 1
+
+    def close(self):
+        """Retire the segment, drop the views, then close and unlink it."""
+        self._release()
+
+    def _release(self):
+        if self.ring is not None:
+            self.ring.header["flags"] |= FLAG_RETIRED
+        self.ring = None
+        if self.shm is not None:
+            try:
+                self.shm.close()
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = None
+
+
+def _ensure_shm_permissions(name: str):
+    if os.name != "posix":
+        return
+
+    if name.startswith("/"):
+        path = f"/dev/shm{name}"
+    else:
+        path = f"/dev/shm/{name}"
+
+    try:
+        os.chmod(path, 0o666)
+    except FileNotFoundError:
+        pass
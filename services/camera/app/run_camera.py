@@ -11,8 +11,10 @@ from pathlib import Path
 
 SERVICE_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(SERVICE_ROOT))
+# common/ lives at the repo root, or is mounted at /app/common in the container
+sys.path.insert(1, str(SERVICE_ROOT.parent.parent))
 
-from code.usb_camera import USB_Camera
+from code.camera_service import CameraService
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
@@ -37,28 +39,26 @@ def main():
     signal.signal(signal.SIGINT, _shutdown_handler(stop_event))
     signal.signal(signal.SIGTERM, _shutdown_handler(stop_event))
 
-    width = _env_int("CAM_WIDTH", 1280)
-    height = _env_int("CAM_HEIGHT", 720)
-    fps = _env_int("CAM_FPS", 120)
-    device = os.getenv("CAM_DEVICE", "/dev/video0")
+    stats_interval = _env_int("CAM_STATS_INTERVAL", 5)
 
+    # One source (CAMERA_ID) by default; CAM_SOURCES=cam0,cam1 runs several in this process
+    service = CameraService.from_env()
     logging.info(
-        "Starting camera capture (width=%s height=%s fps=%s device=%s)",
-        width,
-        height,
-        fps,
-        device,
+        "Starting camera capture (sources=%s)",
+        ", ".join(f"{c.camera_id}->{c.shm_name}" for c in service.cameras),
     )
-
-    camera = USB_Camera(width=width, height=height, fps=fps, dev_video=device)
-    camera.start_capture()
+    service.start()
 
     try:
+        next_report = time.monotonic() + stats_interval
         while not stop_event.is_set():
             time.sleep(0.5)
+            if stats_interval > 0 and time.monotonic() >= next_report:
+                service.report()
+                next_report += stats_interval
     finally:
         logging.info("Stopping camera capture")
-        camera.stop_capture()
+        service.stop()
 
 
 if __name__ == "__main__":
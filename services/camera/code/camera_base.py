@@ -1,106 +1,210 @@
 import os
-import zmq
+import time
+import cv2
 import threading
-from multiprocessing import shared_memory
-import numpy as np
+from collections import deque
 
-class Camera:
-    frame_id_counter=0
-    def __init__(self):
+from common.msg import encode_shm_name, frame_topic, pack_frame_msg
+from common.shm import FrameRingWriter
+
+from .clock_sync import ClockMapper
+from .frame_publisher import FramePublisher
 
-        self.setup_shm()
+def source_env(camera_id, key, default=None):
+    """Per-source setting: ``<CAMERA_ID>_<KEY>`` if set, else ``<KEY>``, else ``default``."""
+    value = os.getenv(camera_id.upper().replace(".", "_") + "_" + key)
+    if value:
+        return value
+    value = os.getenv(key)
+    return value if value else default
 
-        # ZeroMQ publisher
-        self.context = zmq.Context()
-        self.socket = self.context.socket(zmq.PUB)
-        pub_endpoint = os.getenv("ZMQ_PUB_ENDPOINT", "tcp://*:5555")
-        self.socket.bind(pub_endpoint)  # ZeroMQ PUB socket
+
+class Camera:
+    frame_id_counter=0
+    def __init__(self, camera_id=None, shm_name=None, publisher=None, cpus=None):
+        """All arguments are optional; a standalone camera configures itself from the environment.
+
+        ``camera_id`` also selects per-source settings: ``<CAMERA_ID>_<KEY>``
+        (e.g. ``CAM1_SHM_SLOTS``) overrides ``<KEY>``. ``publisher`` is a shared
+        FramePublisher (CameraService); ``cpus`` pins the capture thread(s).
+        """
+        self.camera_id = camera_id or os.getenv("CAMERA_ID", "cam0")
+        self.topic = frame_topic(self.camera_id)
+        self.cpus = cpus
+
+        self.setup_shm(shm_name)
+
+        # ZeroMQ publisher, shared between sources when run under CameraService
+        self.owns_publisher = publisher is None
+        self.publisher = publisher or FramePublisher()
+
+        # Maps the camera's own frame clock (if it has one) onto host CLOCK_MONOTONIC
+        self.clock = ClockMapper()
+
+        # serial: grab, decode, write and publish on one thread
+        # pipelined: grab thread -> handoff deque -> decode/commit/publish thread
+        self.capture_mode = self.getenv("CAPTURE_MODE", "serial")
+        if self.capture_mode not in ("serial", "pipelined"):
+            raise ValueError(f"Unknown CAPTURE_MODE: {self.capture_mode}")
+        self.handoff = deque(maxlen=int(self.getenv("CAPTURE_QUEUE", "2")))
+        self.handoff_ready = threading.Event()
+        self.stats = {"grabbed": 0, "published": 0, "handoff_drops": 0, "driver_drops": 0, "decode_errors": 0}
+        self.last_sensor_ns = None
 
         self.exit_flag = threading.Event()  # For signaling thread to stop
         self.capture_thread = threading.Thread(target=self.capture_frames)  # Create the capture thread
+        self.decode_thread = None
 
-    def setup_shm(self):
+    def getenv(self, key, default=None):
+        return source_env(self.camera_id, key, default)
+
+    def setup_shm(self, shm_name=None):
         def env_int(var, default):
-            value = os.getenv(var)
-            return int(value) if value else default
-
-        self.shm_name = os.getenv("SHM_NAME", "frame_shm")
-        self.max_width = env_int("MAX_WIDTH", 7680)
-        self.max_height = env_int("MAX_HEIGHT", 4320)
-        self.channels = env_int("CHANNELS", 3)
-    
-        # ---- sizes ----
-        self.pixel_bytes = self.max_width * self.max_height * self.channels
-        self.meta_bytes  = 32  # seq + dims + future-proof padding
-        self.shm_size    = self.pixel_bytes + self.meta_bytes
-    
-        try:
-            self.shm = shared_memory.SharedMemory(
-                create=True,
-                name=self.shm_name,
-                size=self.shm_size,
-            )
-        except FileExistsError:
-            old = shared_memory.SharedMemory(name=self.shm_name)
-            old.unlink()
-            old.close()
-            self.shm = shared_memory.SharedMemory(
-                create=True,
-                name=self.shm_name,
-                size=self.shm_size,
-            )
-        self._ensure_shm_permissions()
-    
-        buf = self.shm.buf
-    
-        # ---- pixel buffer (STABLE OFFSET) ----
-        self.frame_buf = np.ndarray(
-            (self.max_height, self.max_width, self.channels),
-            dtype=np.uint8,
-            buffer=buf[:self.pixel_bytes],
-        )
-    
-        # ---- metadata (AFTER pixels) ----
-        meta_offset = self.pixel_bytes
-    
-        self.seq = np.ndarray(
-            (1,),
-            dtype=np.uint64,
-            buffer=buf,
-            offset=meta_offset,
-        )
-    
-        self.meta = np.ndarray(
-            (3,),  # width, height, channels
-            dtype=np.uint32,
-            buffer=buf,
-            offset=meta_offset + 8,
-        )
-    
-        # initialize
-        self.seq[0] = 0
+            return int(self.getenv(var, default))
+
+        self.shm_name = shm_name or self.getenv("SHM_NAME", "frame_shm")
+        self.shm_slots = env_int("SHM_SLOTS", 4)
+        # raw: decoded BGR/gray pixels; jpeg: compressed bitstream (MJPEG passthrough)
+        self.shm_format = self.getenv("SHM_FORMAT", "raw")
+        if self.shm_format not in ("raw", "jpeg"):
+            raise ValueError(f"Unknown SHM_FORMAT: {self.shm_format}")
+        self.jpeg_quality = env_int("SHM_JPEG_QUALITY", 80)
+        # Set by sources that deliver frames still JPEG-encoded (USB MJPEG with conversion off)
+        self.frames_encoded = False
+
+        # N-slot ring with a per-slot seqlock; see common/shm/frame_ring.py.
+        # The segment is sized from the first frame and re-created on a mode change.
+        self.ring_writer = FrameRingWriter(self.shm_name, self.shm_slots)
+        self.shm_name_field = encode_shm_name(self.shm_name)
 
     def capture_frame(self):
         """To be implemented by child classes. Capture frame from camera."""
         raise NotImplementedError("capture_frame() must be implemented in child class")
 
-
-    def write_frame_to_shared_memory(self, frame):
-        """Write the captured frame into shared memory. Use seq to detect tearing"""
-        h, w, c = frame.shape
-    
-        self.seq[0] += 1              # write start (odd)
-        self.meta[:] = (w, h, self.channels)
-        self.frame_buf[:h, :w, :c] = frame
-        self.seq[0] += 1              # write complete (even)
+    def capture_timestamp(self):
+        """Camera-clock timestamp (ns) of the frame just captured, or None if the source has none."""
+        return None
+
+
+    def grab_frame(self):
+        """Pipelined mode, grab thread: take the next frame off the device as cheaply as possible.
+
+        Returns whatever ``decode_frame`` needs (e.g. an undecoded MJPEG buffer), or None.
+        The default simply captures a finished frame.
+        """
+        ok, frame = self.capture_frame()
+        return frame if ok else None
+
+    def decode_frame(self, raw):
+        """Pipelined mode, decode thread: turn a ``grab_frame`` result into a BGR/gray frame, or None."""
+        return raw
+
+    def write_frame_to_shared_memory(self, frame, t_capture_ns=0, t_sensor_ns=0, frame_id=None):
+        """Write the captured frame into the next ring slot. Returns the slot index, or None if JPEG
+        encoding failed. Raises ValueError if the encoded frame does not fit a slot."""
+        if frame_id is None:
+            frame_id = self.frame_id_counter
+        if self.shm_format == "jpeg":
+            if self.frames_encoded:
+                width, height, data = int(self.width), int(self.height), frame
+            else:
+                ok, data = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality])
+                if not ok:
+                    return None
+                height, width = frame.shape[:2]
+            return self.ring_writer.write_encoded(data, width, height, 3, frame_id, t_capture_ns, t_sensor_ns)
+        return self.ring_writer.write(frame, frame_id, t_capture_ns, t_sensor_ns)
 
     def capture_frames(self):
         """Main loop to capture frames continuously, write to shared memory, and send ZeroMQ notifications."""
+        if self.cpus:
+            # Applies to this thread; the pipelined decode thread inherits it
+            os.sched_setaffinity(0, self.cpus)
+        if self.capture_mode == "pipelined":
+            self.grab_frames()
+            return
+
         while not self.exit_flag.is_set():  # Check the exit flag to stop the thread
             ok, frame_bgr = self.capture_frame()  # Capture a frame (implementation in child class)
             if ok and frame_bgr is not None:
-                self.write_frame_to_shared_memory(frame_bgr)
-                self.send_frame_metadata(frame_bgr)
+                t_host_ns = time.monotonic_ns()
+                t_sensor_ns = self.capture_timestamp()
+                t_capture_ns = self.clock.map(t_host_ns, t_sensor_ns)
+                t_sensor_ns = t_sensor_ns or 0
+
+                self.frame_id_counter += 1
+                self.stats["grabbed"] += 1
+                slot = self.commit_frame(frame_bgr, t_capture_ns, t_sensor_ns)
+                if slot is None:
+                    continue
+                self.send_frame_metadata(slot, t_capture_ns, t_sensor_ns)
+                self.stats["published"] += 1
+
+    def grab_frames(self):
+        """Pipelined grab loop: timestamp, number and hand off raw frames; never blocks on consumers."""
+        self.decode_thread = threading.Thread(target=self.decode_frames)
+        self.decode_thread.start()
+        handoff = self.handoff
+        while not self.exit_flag.is_set():
+            raw = self.grab_frame()
+            if raw is None:
+                continue
+            t_host_ns = time.monotonic_ns()
+            t_sensor_ns = self.capture_timestamp()
+            t_capture_ns = self.clock.map(t_host_ns, t_sensor_ns)
+            self.count_driver_drops(t_sensor_ns)
+
+            self.frame_id_counter += 1
+            self.stats["grabbed"] += 1
+            if len(handoff) == handoff.maxlen:
+                self.stats["handoff_drops"] += 1  # append evicts the oldest frame
+            handoff.append((raw, self.frame_id_counter, t_capture_ns, t_sensor_ns or 0))
+            self.handoff_ready.set()
+        self.handoff_ready.set()
+        self.decode_thread.join()
+
+    def decode_frames(self):
+        """Pipelined consumer: decode, commit to SHM and publish the oldest handed-off frame."""
+        handoff = self.handoff
+        while not self.exit_flag.is_set():
+            try:
+                raw, frame_id, t_capture_ns, t_sensor_ns = handoff.popleft()
+            except IndexError:
+                self.handoff_ready.wait(0.1)
+                self.handoff_ready.clear()  # re-checked by popleft before waiting again
+                continue
+
+            frame = self.decode_frame(raw)
+            if frame is None:
+                self.stats["decode_errors"] += 1
+                continue
+            slot = self.commit_frame(frame, t_capture_ns, t_sensor_ns, frame_id)
+            if slot is None:
+                continue
+            self.send_frame_metadata(slot, t_capture_ns, t_sensor_ns, frame_id)
+            self.stats["published"] += 1
+
+    def commit_frame(self, frame, t_capture_ns, t_sensor_ns, frame_id=None):
+        """``write_frame_to_shared_memory`` that drops (and counts) a frame it cannot store,
+        so one bad frame does not end the capture thread."""
+        try:
+            slot = self.write_frame_to_shared_memory(frame, t_capture_ns, t_sensor_ns, frame_id)
+        except ValueError:
+            slot = None  # encoded frame larger than a slot, or not a byte buffer
+        if slot is None:
+            self.stats["decode_errors"] += 1
+        return slot
+
+    def count_driver_drops(self, t_sensor_ns):
+        """Infer frames the driver dropped from gaps in the camera clock."""
+        fps = getattr(self, "fps", 0) or 0
+        if t_sensor_ns is None or fps <= 0:
+            return
+        if self.last_sensor_ns is not None:
+            missed = round((t_sensor_ns - self.last_sensor_ns) * fps / 1e9) - 1
+            if missed > 0:
+                self.stats["driver_drops"] += missed
+        self.last_sensor_ns = t_sensor_ns
 
     def start_capture(self):
         """Start the capture thread."""
@@ -112,40 +216,28 @@ class Camera:
         self.exit_flag.set()  # Signal the thread to stop
         self.capture_thread.join()  # Wait for the thread to finish
         
-        try:
-            self.shm.close()
-            self.shm.unlink()
-        except Exception:
-            pass
-
-        self.socket.close()
-        self.context.term()
-
-    def send_frame_metadata(self, frame):
-        h, w, c = frame.shape
-    
-        self.frame_id_counter += 1
-    
-        msg = {
-            "shm_name": self.shm_name,
-            "width": w,
-            "height": h,
-            "channels": c,
-            "frame_id": self.frame_id_counter,
-        }
-
-        self.socket.send_json(msg)            
-
-    def _ensure_shm_permissions(self):
-        if os.name != "posix":
-            return
-
-        if self.shm_name.startswith("/"):
-            path = f"/dev/shm{self.shm_name}"
-        else:
-            path = f"/dev/shm/{self.shm_name}"
-
-        try:
-            os.chmod(path, 0o666)
-        except FileNotFoundError:
-            pass
+        self.ring_writer.close()
+
+        if self.owns_publisher:
+            self.publisher.close()
+
+    def send_frame_metadata(self, slot, t_capture_ns, t_sensor_ns=0, frame_id=None):
+        """Publish the fixed-layout binary notification for the slot just committed."""
+        if frame_id is None:
+            frame_id = self.frame_id_counter
+        ring = self.ring_writer.ring
+        payload = pack_frame_msg(
+            ring.pixfmt,
+            slot,
+            ring.generation,
+            frame_id,
+            t_capture_ns,
+            t_sensor_ns,
+            ring.width,
+            ring.height,
+            ring.channels,
+            ring.stride,
+            int(ring.slots[slot]["nbytes"]),
+            self.shm_name_field,
+        )
+        self.publisher.send(self.topic, payload)
@@ -0,0 +1,137 @@
+import os
+import time
+
+from .camera_base import source_env
+from .file_camera import FileCamera
+from .frame_publisher import FramePublisher
+from .synthetic_camera import SyntheticCamera
+from .usb_camera import USB_Camera
+
+
+def parse_cpus(value):
+    """"2,3" or "4-7" -> {2, 3} / {4, 5, 6, 7}; empty -> None."""
+    if not value:
+        return None
+    cpus = set()
+    for part in value.split(","):
+        if "-" in part:
+            lo, hi = part.split("-")
+            cpus.update(range(int(lo), int(hi) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def make_camera(camera_id, **kwargs):
+    """Build one source from ``<CAMERA_ID>_<KEY>`` / ``<KEY>`` settings.
+
+    <ID>_CAM_SOURCE=usb (default) | synthetic | file, plus CAM_WIDTH, CAM_HEIGHT,
+    CAM_FPS and the backend's own keys (CAM_DEVICE, CAM_PATTERN, CAM_FILE, ...).
+    ``kwargs`` go to Camera (shm_name, publisher, cpus).
+    """
+    def env(key, default=None):
+        return source_env(camera_id, key, default)
+
+    def env_int(key, default):
+        return int(env(key, default))
+
+    source = env("CAM_SOURCE", "usb")
+    width = env_int("CAM_WIDTH", 1280)
+    height = env_int("CAM_HEIGHT", 720)
+    fps = env_int("CAM_FPS", 120)
+    print(f"[camera] {camera_id}: source={source} width={width} height={height} fps={fps}")
+
+    if source == "usb":
+        device = env("CAM_DEVICE", "/dev/video0")
+        return USB_Camera(width=width, height=height, fps=fps, dev_video=device, camera_id=camera_id, **kwargs)
+    if source == "synthetic":
+        pattern = env("CAM_PATTERN", "bars")
+        return SyntheticCamera(width=width, height=height, fps=fps, pattern=pattern, camera_id=camera_id, **kwargs)
+    if source == "file":
+        path = env("CAM_FILE")
+        if not path:
+            raise RuntimeError(f"{camera_id}: CAM_SOURCE=file requires CAM_FILE (video file or image directory)")
+        return FileCamera(
+            path,
+            fps=env_int("CAM_FILE_FPS", 0),
+            realtime=env_int("CAM_REALTIME", 1) != 0,
+            loop=env_int("CAM_LOOP", 1) != 0,
+            preload=env_int("CAM_PRELOAD", 0) != 0,
+            camera_id=camera_id,
+            **kwargs,
+        )
+    raise RuntimeError(f"{camera_id}: unknown CAM_SOURCE: {source}")
+
+
+class CameraService:
+    """Runs several camera sources in one process.
+
+    Each source has its own SHM ring, topic (``camera.frame.<id>``), capture
+    thread(s) and optional CPU pinning (``<ID>_CAM_CPUS``); all of them share
+    one ZMQ context and PUB socket.
+    """
+
+    def __init__(self, camera_ids, publisher=None):
+        if len(set(camera_ids)) != len(camera_ids):
+            raise ValueError(f"duplicate camera ids in {camera_ids}")
+        self.publisher = publisher or FramePublisher()
+        self.cameras = []
+        base_shm_name = os.getenv("SHM_NAME", "frame_shm")
+        try:
+            for camera_id in camera_ids:
+                shm_name = os.getenv(camera_id.upper().replace(".", "_") + "_SHM_NAME")
+                if not shm_name:
+                    shm_name = base_shm_name if len(camera_ids) == 1 else f"{base_shm_name}_{camera_id}"
+                self.cameras.append(make_camera(
+                    camera_id,
+                    shm_name=shm_name,
+                    publisher=self.publisher,
+                    cpus=parse_cpus(source_env(camera_id, "CAM_CPUS")),
+                ))
+        except Exception:
+            self.publisher.close()
+            raise
+        self.last_report = None
+        self.last_counts = {}
+
+    @classmethod
+    def from_env(cls):
+        """CAM_SOURCES=cam0,cam1,... (default: the single CAMERA_ID)."""
+        ids = [s.strip() for s in os.getenv("CAM_SOURCES", "").split(",") if s.strip()]
+        return cls(ids or [os.getenv("CAMERA_ID", "cam0")])
+
+    def start(self):
+        for camera in self.cameras:
+            camera.start_capture()
+        self.last_report = time.monotonic()
+        self.last_counts = {c.camera_id: dict(c.stats) for c in self.cameras}
+
+    def stop(self):
+        for camera in self.cameras:
+            camera.stop_capture()
+        self.publisher.close()
+
+    def rates(self):
+        """Per-source {published fps, grabbed fps, drops} since the previous call."""
+        now = time.monotonic()
+        dt = max(now - self.last_report, 1e-9)
+        rates = {}
+        for camera in self.cameras:
+            stats = dict(camera.stats)
+            prev = self.last_counts.get(camera.camera_id, stats)
+            rates[camera.camera_id] = {
+                "fps": (stats["published"] - prev["published"]) / dt,
+                "grab_fps": (stats["grabbed"] - prev["grabbed"]) / dt,
+                "handoff_drops": stats["handoff_drops"] - prev["handoff_drops"],
+                "driver_drops": stats["driver_drops"] - prev["driver_drops"],
+            }
+            self.last_counts[camera.camera_id] = stats
+        self.last_report = now
+        return rates
+
+    def report(self):
+        for camera_id, r in self.rates().items():
+            print(
+                f"[camera] {camera_id}: {r['fps']:.1f} fps (grab {r['grab_fps']:.1f}) "
+                f"drops handoff={r['handoff_drops']} driver={r['driver_drops']}"
+            )
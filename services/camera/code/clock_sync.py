@@ -0,0 +1,86 @@
+"""Camera clock -> host CLOCK_MONOTONIC mapping.
+
+Fits ``t_cam = a * t_host + b`` over a sliding window of (host, camera)
+timestamp pairs and tracks the offset online between refits, as described in
+docs/usb3_camera_timestamp_sync.md. Inverting the model turns a camera
+timestamp into host time with the per-frame transport jitter removed.
+
+Without a latch (TimestampLatch) the host half of each pair is the time the
+frame reached user space, so ``b`` also absorbs the mean transport latency;
+the mapped time is then "jitter-free arrival time" rather than exposure time.
+"""
+
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+
+class ClockMapper:
+    def __init__(self, window: int = 1024, min_pairs: int = 16, refit_every: int = 32,
+                 alpha: float = 0.05, reset_ns: int = 50_000_000):
+        self.window = window
+        self.min_pairs = min_pairs
+        self.refit_every = refit_every
+        self.alpha = alpha
+        self.reset_ns = reset_ns
+        self.reset()
+
+    def reset(self):
+        self.pairs = deque(maxlen=self.window)
+        self.t0_host = None     # fit origin, keeps float64 precision at ns scale
+        self.t0_cam = None
+        self.a = 1.0
+        self.b = 0.0
+        self.ready = False
+        self.since_fit = 0
+        self.residual_ns = 0.0  # EWMA of |residual|
+        self.resets = 0
+
+    @property
+    def drift_ppm(self) -> float:
+        return (self.a - 1.0) * 1e6
+
+    def add_pair(self, t_host_ns: int, t_cam_ns: int):
+        if self.t0_host is None:
+            self.t0_host, self.t0_cam = t_host_ns, t_cam_ns
+        x = float(t_host_ns - self.t0_host)
+        y = float(t_cam_ns - self.t0_cam)
+
+        if self.ready:
+            residual = y - (self.a * x + self.b)
+            if abs(residual) > self.reset_ns:
+                # Camera clock restarted or jumped; the old model is meaningless
+                self.reset()
+                self.resets += 1
+                self.add_pair(t_host_ns, t_cam_ns)
+                return
+            # Drift tracking between refits: nudge the offset only
+            self.b += self.alpha * residual
+            self.residual_ns += self.alpha * (abs(residual) - self.residual_ns)
+
+        self.pairs.append((x, y))
+        self.since_fit += 1
+        if len(self.pairs) >= self.min_pairs and (not self.ready or self.since_fit >= self.refit_every):
+            self._fit()
+
+    def _fit(self):
+        xy = np.asarray(self.pairs)
+        self.a, self.b = np.polyfit(xy[:, 0], xy[:, 1], 1)
+        self.ready = True
+        self.since_fit = 0
+
+    def to_host(self, t_cam_ns: int) -> Optional[int]:
+        """Camera timestamp -> host monotonic ns, or None until the model is fitted."""
+        if not self.ready:
+            return None
+        y = float(t_cam_ns - self.t0_cam)
+        return self.t0_host + int(round((y - self.b) / self.a))
+
+    def map(self, t_host_ns: int, t_cam_ns: Optional[int]) -> int:
+        """Record the pair and return the best host-clock capture time for the frame."""
+        if t_cam_ns is None:
+            return t_host_ns
+        self.add_pair(t_host_ns, t_cam_ns)
+        t_mapped = self.to_host(t_cam_ns)
+        return t_host_ns if t_mapped is None else t_mapped
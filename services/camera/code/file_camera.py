@@ -0,0 +1,69 @@
+import os
+from pathlib import Path
+
+import cv2
+
+from .camera_base import Camera
+from .frame_pacer import FramePacer
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"}
+
+
+class FileCamera(Camera):
+    """Replays a video file or a directory of images as a camera.
+
+    ``realtime`` paces at ``fps`` (default: the video's own rate, or 30 for an
+    image directory); otherwise frames are produced as fast as possible.
+    ``preload`` decodes an image directory once up front so that replay
+    measures the data plane rather than image decoding.
+    """
+
+    def __init__(self, path, fps=0, realtime=True, loop=True, preload=False, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.loop = loop
+        self.cap = None
+        self.images = []
+        self.cache = None
+        self.index = 0
+
+        if os.path.isdir(path):
+            self.images = sorted(
+                str(p) for p in Path(path).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES
+            )
+            if not self.images:
+                raise RuntimeError(f"No images found in {path}")
+            if preload:
+                self.cache = [cv2.imread(p, cv2.IMREAD_COLOR) for p in self.images]
+            native_fps = 30.0
+        else:
+            self.cap = cv2.VideoCapture(path)
+            if not self.cap.isOpened():
+                raise RuntimeError(f"Could not open {path}")
+            native_fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+        self.fps = fps if fps > 0 else native_fps
+        self.pacer = FramePacer(self.fps if realtime else 0)
+        print(f"Replaying {path} at {self.fps if realtime else 'max'} fps (loop={loop})")
+
+    def capture_frame(self):
+        self.pacer.wait()
+        if self.cap is not None:
+            ok, frame = self.cap.read()
+            if not ok and self.loop:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, frame = self.cap.read()
+            if not ok:
+                self.exit_flag.set()
+                return False, None
+            return True, frame
+
+        if self.index >= len(self.images):
+            if not self.loop:
+                self.exit_flag.set()
+                return False, None
+            self.index = 0
+        i = self.index
+        self.index += 1
+        frame = self.cache[i] if self.cache is not None else cv2.imread(self.images[i], cv2.IMREAD_COLOR)
+        return frame is not None, frame
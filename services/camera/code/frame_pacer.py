@@ -0,0 +1,25 @@
+import time
+
+
+class FramePacer:
+    """Absolute-deadline pacing for sources that have no sensor clock of their own.
+
+    ``fps <= 0`` disables pacing (as fast as possible). Deadlines advance by a
+    fixed period from a fixed origin, so sleep jitter does not accumulate;
+    if the consumer falls more than one period behind, the schedule restarts
+    from now instead of bursting to catch up.
+    """
+
+    def __init__(self, fps: float):
+        self.period = 1.0 / fps if fps > 0 else 0.0
+        self.next_deadline = None
+
+    def wait(self):
+        if self.period == 0.0:
+            return
+        now = time.monotonic()
+        if self.next_deadline is None or now - self.next_deadline > self.period:
+            self.next_deadline = now
+        elif self.next_deadline > now:
+            time.sleep(self.next_deadline - now)
+        self.next_deadline += self.period
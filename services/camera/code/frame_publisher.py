@@ -0,0 +1,29 @@
+import os
+import threading
+
+import zmq
+
+from common.msg import send_frame_msg
+
+
+class FramePublisher:
+    """One ZMQ context and PUB socket shared by every source in the camera service.
+
+    ZMQ sockets are not thread-safe, so sends from the per-source capture
+    threads are serialized with a lock (held for one 2-part send).
+    """
+
+    def __init__(self, endpoint=None):
+        self.endpoint = endpoint or os.getenv("ZMQ_PUB_ENDPOINT", "tcp://*:5555")
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.PUB)
+        self.socket.bind(self.endpoint)
+        self.lock = threading.Lock()
+
+    def send(self, topic: bytes, payload: bytes):
+        with self.lock:
+            send_frame_msg(self.socket, topic, payload)
+
+    def close(self):
+        self.socket.close()
+        self.context.term()
@@ -0,0 +1,50 @@
+import numpy as np
+
+from .camera_base import Camera
+from .frame_pacer import FramePacer
+
+
+class SyntheticCamera(Camera):
+    """Hardware-free source: a moving test pattern at any resolution and rate.
+
+    Patterns:
+      bars   colour bars scrolling horizontally (compresses like a real scene)
+      noise  a few pre-rendered random frames in rotation (worst case for JPEG)
+
+    Frames are views into a pre-rendered image, so generating one costs
+    nothing; the SHM write is the only per-frame copy, as with a real camera.
+    ``fps <= 0`` runs as fast as the pipeline allows.
+    """
+
+    def __init__(self, width=1280, height=720, fps=120, pattern="bars", speed=8, **kwargs):
+        super().__init__(**kwargs)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pattern = pattern
+        self.speed = speed
+        self.pacer = FramePacer(fps)
+        self.count = 0
+
+        if pattern == "bars":
+            # One bar period past the right edge so any offset is a valid slice
+            period = max(width // 8, 1)
+            x = np.arange(width + period)
+            hue = (x % period) * 255 // period
+            row = np.stack([hue, 255 - hue, (x // period % 2) * 255], axis=-1).astype(np.uint8)
+            ramp = np.linspace(0.25, 1.0, height, dtype=np.float32)[:, None, None]
+            self.base = (row[None, :, :] * ramp).astype(np.uint8)
+            self.period = period
+        elif pattern == "noise":
+            rng = np.random.default_rng(0)
+            self.noise = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+        else:
+            raise ValueError(f"unknown synthetic pattern: {pattern}")
+
+    def capture_frame(self):
+        self.pacer.wait()
+        self.count += 1
+        if self.pattern == "bars":
+            off = (self.count * self.speed) % self.period
+            return True, self.base[:, off:off + self.width]
+        return True, self.noise[self.count % len(self.noise)]
@@ -1,12 +1,13 @@
 import cv2
 from .camera_base import Camera
 class USB_Camera(Camera):
-    def __init__(self, width=1280, height=720, fps=120, dev_video="/dev/video0"):
-        super().__init__()
+    def __init__(self, width=1280, height=720, fps=120, dev_video="/dev/video0", **kwargs):
+        super().__init__(**kwargs)
         self.width=width
         self.height=height
         self.fps=120
         self.dev_video = dev_video
+        self.raw_mjpeg = False
         self.cap = self.open_cv_capture()
 
     def open_cv_capture(self):
@@ -29,6 +30,14 @@ class USB_Camera(Camera):
         print(f"Height set to: {self.height}")
         print(f"FPS set to: {self.fps}")
 
+        # Keep the MJPEG bitstream undecoded when it is stored as-is (SHM_FORMAT=jpeg)
+        # or decoded later on the pipelined decode thread
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC)).to_bytes(4, "little")
+        if (self.capture_mode == "pipelined" or self.shm_format == "jpeg") and fourcc == b"MJPG":
+            self.raw_mjpeg = cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        self.frames_encoded = self.raw_mjpeg and self.shm_format == "jpeg"
+        print(f"Pixel format: {fourcc.decode('ascii', 'replace')} (raw MJPEG: {self.raw_mjpeg}, SHM: {self.shm_format})")
+
         return cap
 
 
@@ -38,5 +47,26 @@ class USB_Camera(Camera):
         if ok and frame_bgr is not None:
             return ok, frame_bgr  # Ensure this is a tuple with exactly two elements
         return False, None  # If something goes wrong, return False and None
+
+    def grab_frame(self):
+        """Dequeue the next V4L2 buffer. With raw MJPEG this is a memcpy of the bitstream, no decode."""
+        if not self.cap.grab():
+            return None
+        ok, raw = self.cap.retrieve()
+        if not ok or raw is None:
+            return None
+        return raw
+
+    def decode_frame(self, raw):
+        if self.raw_mjpeg and not self.frames_encoded:
+            return cv2.imdecode(raw.reshape(-1), cv2.IMREAD_COLOR)
+        return raw
+
+    def capture_timestamp(self):
+        """V4L2 buffer timestamp of the last frame (driver clock), in ns."""
+        ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if ms > 0:
+            return int(ms * 1e6)
+        return None
     
     
@@ -9,6 +9,7 @@ IMAGE_NAME="${CAMERA_IMAGE:-vision_stack-camera}"
 docker run --rm \
     --env-file "${SCRIPT_DIR}/.env" \
     -v "${SCRIPT_DIR}:/app" \
+    -v "${SCRIPT_DIR}/../../common:/app/common" \
     --ipc=host \
     --network=host \
     --device "${CAM_DEVICE}:${CAM_DEVICE}" \
@@ -0,0 +1,254 @@
+"""Benchmark: synthetic camera -> SHM ring -> ZMQ notify -> reader process(es).
+
+Drives the real Camera capture path with SyntheticCamera, so no hardware is
+needed, and sweeps a resolution/fps matrix. Per run it reports
+
+  write_us       Camera.write_frame_to_shared_memory (ring commit)
+  notify_us      t_capture -> notification received by the reader
+  latency_us     t_capture -> frame read (and consumed) from SHM by the reader
+  torn_rate      reads whose seqlock check failed / reads
+  drop_rate      frame_id gaps seen by the reader / frames expected
+  cpu            % of one core: camera capture (+decode) threads, each reader
+
+as JSON, for regression tracking:
+
+    python services/camera/tests/bench_data_plane.py \\
+        --matrix 1280x720@240,3840x2160@60 --seconds 5 --out bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+CAMERA_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = CAMERA_ROOT.parent.parent
+sys.path.insert(0, str(CAMERA_ROOT))
+sys.path.insert(1, str(REPO_ROOT))
+
+DEFAULT_MATRIX = "1280x720@120,1280x720@240,1920x1080@60,1920x1080@120,3840x2160@30,3840x2160@60"
+ENDPOINT = "tcp://127.0.0.1:5597"
+
+
+def percentiles(samples_ns):
+    if not samples_ns:
+        return None
+    a = np.asarray(samples_ns, dtype=np.float64) / 1e3
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return {"p50": round(p50, 1), "p95": round(p95, 1), "p99": round(p99, 1), "max": round(a.max(), 1)}
+
+
+# ---------------------------------------------------------------- reader side
+
+def run_reader(args):
+    """Subscribe, read every notified slot, report JSON on stdout after ``--seconds``."""
+    import cv2
+    import zmq
+
+    from common.msg import FRAME_TOPIC_PREFIX, recv_frame_msg
+    from common.shm import FrameReader
+
+    ctx = zmq.Context()
+    sub = ctx.socket(zmq.SUB)
+    sub.connect(args.endpoint)
+    sub.setsockopt_string(zmq.SUBSCRIBE, FRAME_TOPIC_PREFIX + ".")
+    sub.RCVTIMEO = 2000
+    reader = FrameReader()
+
+    notify, latency = [], []
+    first_id = last_id = None
+    gaps = 0
+    t_end = None
+    cpu0 = None
+
+    while t_end is None or time.monotonic() < t_end:
+        try:
+            _, msg = recv_frame_msg(sub)
+        except zmq.Again:
+            break
+        t_recv = time.monotonic_ns()
+        if not reader.attach(msg.shm_name, msg.generation):
+            continue
+        if t_end is None:
+            # Measure from the first frame on; earlier ones predate the subscription
+            t_end = time.monotonic() + args.seconds
+            cpu0 = time.process_time()
+            reader.reads = reader.torn_reads = 0
+
+        view = reader.read(msg.slot)
+        if view is not None:
+            if args.consume == "copy":
+                out = view.image.copy()
+            elif args.consume == "resize":
+                out = cv2.resize(view.image, (640, 360), interpolation=cv2.INTER_LINEAR)
+            if reader.is_valid(view):
+                latency.append(time.monotonic_ns() - msg.t_capture_ns)
+        notify.append(t_recv - msg.t_capture_ns)
+
+        if first_id is None:
+            first_id = msg.frame_id
+        elif msg.frame_id > last_id + 1:
+            gaps += msg.frame_id - last_id - 1
+        last_id = msg.frame_id
+
+    cpu = time.process_time() - cpu0 if cpu0 is not None else 0.0
+    expected = (last_id - first_id + 1) if first_id is not None else 0
+    reads = reader.reads
+    reader.close()
+    sub.close()
+    ctx.term()
+
+    print(json.dumps({
+        "frames": len(notify),
+        "expected": expected,
+        "drop_rate": round(gaps / expected, 6) if expected else None,
+        "torn_rate": round(reader.torn_reads / reads, 6) if reads else None,
+        "notify_us": percentiles(notify),
+        "latency_us": percentiles(latency),
+        "cpu_pct": round(100.0 * cpu / args.seconds, 1),
+    }))
+
+
+# ---------------------------------------------------------------- writer side
+
+def make_camera_class():
+    from code.synthetic_camera import SyntheticCamera
+
+    class TimedSyntheticCamera(SyntheticCamera):
+        """SyntheticCamera that records ring-commit time and per-thread CPU."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.write_ns = []
+            self.thread_cpu = {}
+
+        def write_frame_to_shared_memory(self, *args, **kwargs):
+            t0 = time.perf_counter_ns()
+            slot = super().write_frame_to_shared_memory(*args, **kwargs)
+            self.write_ns.append(time.perf_counter_ns() - t0)
+            return slot
+
+        def capture_frames(self):
+            t0 = time.thread_time()
+            try:
+                super().capture_frames()
+            finally:
+                self.thread_cpu["capture"] = time.thread_time() - t0
+
+        def decode_frames(self):
+            t0 = time.thread_time()
+            try:
+                super().decode_frames()
+            finally:
+                self.thread_cpu["decode"] = time.thread_time() - t0
+
+    return TimedSyntheticCamera
+
+
+def run_case(camera_cls, width, height, fps, args):
+    from code.frame_publisher import FramePublisher
+
+    publisher = FramePublisher(args.endpoint)
+    camera = camera_cls(
+        width=width, height=height, fps=fps, pattern=args.pattern,
+        camera_id="bench", shm_name="vision_bench_shm", publisher=publisher,
+    )
+    readers = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--reader", "--endpoint", args.endpoint,
+             "--seconds", str(args.seconds), "--consume", args.consume],
+            stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(args.readers)
+    ]
+    time.sleep(0.5)  # let the subscribers connect
+
+    t_start = time.monotonic()
+    camera.start_capture()
+    reader_out = [json.loads(p.communicate()[0] or "null") for p in readers]
+    camera.stop_capture()
+    elapsed = time.monotonic() - t_start
+    publisher.close()
+
+    published = camera.stats["published"]
+    return {
+        "width": width,
+        "height": height,
+        "fps_target": fps,
+        "fps_achieved": round(published / elapsed, 1),
+        "capture_mode": camera.capture_mode,
+        "shm_format": camera.shm_format,
+        "write_us": percentiles(camera.write_ns),
+        "camera": dict(camera.stats),
+        "cpu_pct": {k: round(100.0 * v / elapsed, 1) for k, v in camera.thread_cpu.items()},
+        "readers": reader_out,
+    }
+
+
+def parse_matrix(text):
+    cases = []
+    for item in text.split(","):
+        size, fps = item.strip().split("@")
+        w, h = size.split("x")
+        cases.append((int(w), int(h), int(fps)))
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--matrix", default=DEFAULT_MATRIX, help="WxH@FPS,... (FPS 0 = unpaced)")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=1)
+    parser.add_argument("--consume", choices=["none", "copy", "resize"], default="resize",
+                        help="reader work per frame (resize mirrors HostRTP)")
+    parser.add_argument("--pattern", choices=["bars", "noise"], default="bars")
+    parser.add_argument("--mode", choices=["serial", "pipelined"], default=None,
+                        help="CAPTURE_MODE (default: environment)")
+    parser.add_argument("--format", choices=["raw", "jpeg"], default=None,
+                        help="SHM_FORMAT (default: environment)")
+    parser.add_argument("--endpoint", default=ENDPOINT)
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    parser.add_argument("--reader", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.reader:
+        run_reader(args)
+        return
+
+    if args.mode:
+        os.environ["CAPTURE_MODE"] = args.mode
+    if args.format:
+        os.environ["SHM_FORMAT"] = args.format
+
+    camera_cls = make_camera_class()
+    results = []
+    for width, height, fps in parse_matrix(args.matrix):
+        print(f"[bench] {width}x{height}@{fps} ...", file=sys.stderr)
+        results.append(run_case(camera_cls, width, height, fps, args))
+
+    report = {
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "cpus": os.cpu_count(),
+        },
+        "config": {k: v for k, v in vars(args).items() if k not in ("reader", "out")},
+        "t_wall": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Micro-benchmark: binary frame notification vs the old send_json path.
+
+Runs without a camera:
+
+    python services/camera/tests/bench_frame_msg.py --count 200000
+"""
+
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+import sys
+
+import zmq
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from common.msg import encode_shm_name, frame_topic, pack_frame_msg, recv_frame_msg, send_frame_msg, unpack_frame_msg
+
+SHM_NAME = "vision_camera_frame_shm"
+SHM_NAME_FIELD = encode_shm_name(SHM_NAME)
+
+
+def json_msg(i):
+    return {
+        "shm_name": SHM_NAME,
+        "width": 1280,
+        "height": 720,
+        "channels": 3,
+        "frame_id": i,
+        "slot": i % 4,
+        "generation": 1,
+        "t_capture_ns": time.monotonic_ns(),
+        "t_sensor_ns": 0,
+    }
+
+
+def binary_msg(i):
+    return pack_frame_msg(2, i % 4, 1, i, time.monotonic_ns(), 0, 1280, 720, 3, 3840, 3840 * 720, SHM_NAME_FIELD)
+
+
+def bench_codec(count):
+    t0 = time.perf_counter()
+    for i in range(count):
+        json.loads(json.dumps(json_msg(i)).encode())
+    t_json = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(count):
+        unpack_frame_msg(binary_msg(i))
+    t_bin = time.perf_counter() - t0
+
+    size_json = len(json.dumps(json_msg(1)).encode())
+    size_bin = len(frame_topic("cam0")) + len(binary_msg(1))
+    return t_json, t_bin, size_json, size_bin
+
+
+def bench_socket(count, binary):
+    ctx = zmq.Context()
+    pub = ctx.socket(zmq.PUB)
+    pub.setsockopt(zmq.SNDHWM, 0)
+    pub.bind("inproc://bench")
+    sub = ctx.socket(zmq.SUB)
+    sub.setsockopt(zmq.RCVHWM, 0)
+    sub.connect("inproc://bench")
+    sub.setsockopt_string(zmq.SUBSCRIBE, "" if not binary else "camera.frame.")
+    time.sleep(0.1)  # slow joiner
+
+    topic = frame_topic("cam0")
+    done = threading.Event()
+
+    def receiver():
+        for _ in range(count):
+            if binary:
+                recv_frame_msg(sub)
+            else:
+                sub.recv_json()
+        done.set()
+
+    rx = threading.Thread(target=receiver)
+    rx.start()
+    t0 = time.perf_counter()
+    for i in range(count):
+        if binary:
+            send_frame_msg(pub, topic, binary_msg(i))
+        else:
+            pub.send_json(json_msg(i))
+    done.wait()
+    elapsed = time.perf_counter() - t0
+    rx.join()
+
+    pub.close()
+    sub.close()
+    ctx.term()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+    n = args.count
+
+    t_json, t_bin, size_json, size_bin = bench_codec(n)
+    print(f"codec  json  : {t_json / n * 1e6:6.2f} us/msg  {size_json} B")
+    print(f"codec  binary: {t_bin / n * 1e6:6.2f} us/msg  {size_bin} B (topic + struct)")
+
+    t_json = bench_socket(n, binary=False)
+    t_bin = bench_socket(n, binary=True)
+    print(f"pubsub json  : {t_json / n * 1e6:6.2f} us/msg  {n / t_json:9.0f} msg/s")
+    print(f"pubsub binary: {t_bin / n * 1e6:6.2f} us/msg  {n / t_bin:9.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
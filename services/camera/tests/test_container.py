@@ -1,38 +1,28 @@
 """Standalone camera viewer + diagnostics for the containerized camera service."""
 
-import os
 import time
 import cv2
 import zmq
-import numpy as np
-import mmap
 import logging
+import sys
+from pathlib import Path
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
-
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
 
-def _env_int(key: str, default: int) -> int:
-    value = os.getenv(key)
-    return int(value) if value is not None else default
+from common.msg import FRAME_TOPIC_PREFIX, recv_frame_msg
+from common.shm import PIXFMT_JPEG, FrameReader
 
-
-def _shm_path(name: str) -> str:
-    return name if name.startswith("/") else f"/dev/shm/{name}"
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
 
 def main():
     context = zmq.Context()
     socket = context.socket(zmq.SUB)
     socket.connect("tcp://localhost:5555")
-    socket.setsockopt_string(zmq.SUBSCRIBE, "")
+    socket.setsockopt_string(zmq.SUBSCRIBE, FRAME_TOPIC_PREFIX + ".")
 
-    shm_map = None
-    frame_view = None
-    width = height = channels = None
-
-    max_width = _env_int("MAX_WIDTH", 7680)
-    max_height = _env_int("MAX_HEIGHT", 4320)
-    max_channels = _env_int("CHANNELS", 3)
+    reader = FrameReader()
 
     window_name = "camera container"
     cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
@@ -43,36 +33,29 @@ def main():
 
     try:
         while True:
-            msg = socket.recv_json()
-
-            if shm_map is None:
-                width = int(msg["width"])
-                height = int(msg["height"])
-                channels = int(msg["channels"])
-                shm_name = msg["shm_name"]
-                buffer_size = max_width * max_height * max_channels
-                fd = os.open(_shm_path(shm_name), os.O_RDONLY)
-                shm_map = mmap.mmap(fd, buffer_size, access=mmap.ACCESS_READ)
-                os.close(fd)
-                frame_raw = np.ndarray(
-                    (max_height, max_width, max_channels),
-                    dtype=np.uint8,
-                    buffer=shm_map,
-                )
-                frame_view = frame_raw[:height, :width, :channels]
+            _, msg = recv_frame_msg(socket)
+
+            generation = reader.ring.generation if reader.attached else None
+            if not reader.attach(msg.shm_name, msg.generation):
+                continue
+            if reader.ring.generation != generation:
+                ring = reader.ring
                 logging.info(
-                    "attached SHM %s (%dx%dx%d) view from %dx%dx%d",
-                    shm_name,
-                    width,
-                    height,
-                    channels,
-                    max_width,
-                    max_height,
-                    max_channels,
+                    "attached SHM %s gen %d (%d slots of %dx%dx%d)",
+                    msg.shm_name,
+                    ring.generation,
+                    ring.slot_count,
+                    ring.width,
+                    ring.height,
+                    ring.channels,
                 )
 
+            # Copy: the overlay below draws on the frame
+            view = reader.read(msg.slot, copy=True)
+            if view is None:
+                continue
+            frame = view.image if view.pixfmt != PIXFMT_JPEG else cv2.imdecode(view.image, cv2.IMREAD_COLOR)
             frame_count += 1
-            frame = frame_view.copy()
 
             now = time.time()
             elapsed = now - last_fps_calc
@@ -100,8 +83,7 @@ def main():
     except KeyboardInterrupt:
         logging.info("interrupted")
     finally:
-        if shm_map is not None:
-            shm_map.close()
+        reader.close()
         socket.close()
         context.term()
         cv2.destroyAllWindows()
@@ -1,22 +1,17 @@
 import time
 import cv2
 import zmq
-import numpy as np
-from multiprocessing import shared_memory
 
 from pathlib import Path
 import sys
 
 CAMERA_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(CAMERA_ROOT))
+sys.path.insert(1, str(CAMERA_ROOT.parent.parent))
 
-from code.shared_memory_manager import SharedMemoryManager
 from code.usb_camera import USB_Camera
-
-
-# ---- constants (must match camera allocation for now) ----
-MAX_WIDTH  = 7680
-MAX_HEIGHT = 4320
+from common.msg import FRAME_TOPIC_PREFIX, recv_frame_msg
+from common.shm import PIXFMT_JPEG, FrameReader
 
 def main():
     # Create a USB camera instance (camera still owns SHM)
@@ -28,11 +23,9 @@ def main():
     context = zmq.Context()
     socket = context.socket(zmq.SUB)
     socket.connect("tcp://localhost:5555")
-    socket.setsockopt_string(zmq.SUBSCRIBE, "")
+    socket.setsockopt_string(zmq.SUBSCRIBE, FRAME_TOPIC_PREFIX + ".")
 
-    width = height = channels = None
-    shm = None
-    frame_buf = None
+    reader = FrameReader()
 
     last_fps_calc = time.time()
     frame_count = 0
@@ -40,27 +33,21 @@ def main():
 
     try:
         while True:
-            msg = socket.recv_json()
+            _, msg = recv_frame_msg(socket)
 
             # First frame: attach to shared memory
-            if shm is None:
-                width    = msg["width"]
-                height   = msg["height"]
-                channels = msg["channels"]
-                shm_name = msg["shm_name"]
-
-                shm = shared_memory.SharedMemory(name=shm_name)
-                frame_buf = np.ndarray(
-                    (MAX_HEIGHT, MAX_WIDTH, channels),
-                    dtype=np.uint8,
-                    buffer=shm.buf[: MAX_WIDTH * MAX_HEIGHT * channels]
-                )
-
+            if not reader.attached:
                 cv2.namedWindow("stream", cv2.WINDOW_NORMAL)
-                cv2.resizeWindow("stream", width, height)
-
+                cv2.resizeWindow("stream", msg.width, msg.height)
+            if not reader.attach(msg.shm_name, msg.generation):
+                continue
+
+            # Copy: the overlay below draws on the frame
+            view = reader.read(msg.slot, copy=True)
+            if view is None:
+                continue
+            frame = view.image if view.pixfmt != PIXFMT_JPEG else cv2.imdecode(view.image, cv2.IMREAD_COLOR)
             frame_count += 1
-            frame = frame_buf[:height, :width, :].copy()
 
             now = time.time()
             elapsed = now - last_fps_calc
@@ -83,8 +70,7 @@ def main():
         pass
     finally:
         camera.stop_capture()
-        if shm is not None:
-            shm.close()
+        reader.close()
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
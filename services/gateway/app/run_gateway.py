@@ -4,6 +4,8 @@ from pathlib import Path
 
 SERVICE_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(SERVICE_ROOT))
+# common/ lives at the repo root, or is mounted at /app/common in the container
+sys.path.insert(1, str(SERVICE_ROOT.parent.parent))
 
 from code.rtp_tx_process import run as rtp_run
 from code.udp_rx_process import run as udp_run
@@ -1,6 +1,28 @@
 # This file would handle the received UDP messages
 # For example, mapping the message to actions like controlling platform components.
-def handle_control_intent(intent: dict):
+import json
+import os
+
+import zmq
+
+# Intents are re-published inside the gateway (udp_rx -> rtp_tx, ...) on this topic
+GATEWAY_CONTROL_ENDPOINT = os.getenv("GATEWAY_CONTROL_ENDPOINT", "ipc:///tmp/gateway_control")
+GATEWAY_CONTROL_TOPIC = b"gateway.control"
+
+_pub = None
+
+
+def _publisher():
+    global _pub
+    if _pub is None:
+        _pub = zmq.Context.instance().socket(zmq.PUB)
+        _pub.bind(GATEWAY_CONTROL_ENDPOINT)
+    return _pub
+
+
+def handle_control_intent(intent: dict, raw: bytes = None):
     # Interpret command and execute appropriate platform action
-    print(f"Handling intent: {intent}")
+    # Gateway-internal consumers (HostRTP: RATE_BUDGET, ...) pick what they handle.
+    # ``raw`` is the JSON as received, forwarded as-is instead of re-encoding ``intent``.
+    _publisher().send_multipart((GATEWAY_CONTROL_TOPIC, raw if raw is not None else json.dumps(intent).encode()))
     # Add logic here to control platform (e.g., movement, mode change, etc.)
@@ -0,0 +1,98 @@
+import threading
+from collections import deque
+
+
+class EncoderPool:
+    """Runs a per-frame encode function on N worker threads and emits results in order.
+
+    OpenCV releases the GIL in resize/imencode, so threads scale across cores.
+    Frames are numbered on ``submit``; the emitter thread hands results to
+    ``sink`` strictly in that order (a reorder buffer absorbs workers finishing
+    out of order). When every worker is busy and ``max_pending`` frames are
+    waiting, the oldest waiting frame is dropped, so the output always moves
+    toward the newest frame instead of building latency.
+
+    ``encode(item)`` returns the payload or None (frame skipped, e.g. torn);
+    ``sink(payload)`` returns False to stop the pool.
+    """
+
+    def __init__(self, encode, sink, workers: int = 2, max_pending: int = 0):
+        self.encode = encode
+        self.sink = sink
+        self.max_pending = max_pending or workers
+
+        self.cond = threading.Condition()
+        self.pending = deque()   # (seq, item) waiting for a worker
+        self.done = {}           # seq -> payload, or None if skipped/dropped
+        self.next_submit = 0
+        self.next_emit = 0
+        self.running = True
+
+        self.submitted = 0
+        self.emitted = 0
+        self.dropped = 0         # oldest-first drops while workers were behind
+        self.skipped = 0         # encode returned None
+
+        self.threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+        self.threads.append(threading.Thread(target=self._emitter, daemon=True))
+        for t in self.threads:
+            t.start()
+
+    def submit(self, item):
+        with self.cond:
+            if len(self.pending) >= self.max_pending:
+                seq, _ = self.pending.popleft()
+                self.done[seq] = None
+                self.dropped += 1
+            self.pending.append((self.next_submit, item))
+            self.next_submit += 1
+            self.submitted += 1
+            self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        for t in self.threads:
+            t.join()
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                seq, item = self.pending.popleft()
+
+            payload = self.encode(item)
+
+            with self.cond:
+                self.done[seq] = payload
+                if payload is None:
+                    self.skipped += 1
+                if seq == self.next_emit:
+                    self.cond.notify_all()
+
+    def _emitter(self):
+        while True:
+            with self.cond:
+                while self.running and self.next_emit not in self.done:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                # Take every result that is now in order
+                ready = []
+                while self.next_emit in self.done:
+                    ready.append(self.done.pop(self.next_emit))
+                    self.next_emit += 1
+
+            for payload in ready:
+                if payload is None:
+                    continue
+                self.emitted += 1
+                if self.sink(payload) is False:
+                    with self.cond:
+                        self.running = False
+                        self.cond.notify_all()
+                    return
@@ -0,0 +1,37 @@
+import threading
+
+
+class FrameMailbox:
+    """Latest-only handoff between the notify thread and the encoder.
+
+    ``put`` replaces whatever the consumer has not taken yet (counted in
+    ``overwritten``) and wakes it immediately; ``get`` sleeps on a condition
+    until a frame arrives or the mailbox is closed, so an idle camera costs
+    no polling.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.item = None
+        self.closed = False
+        self.overwritten = 0
+
+    def put(self, item):
+        with self.cond:
+            if self.item is not None:
+                self.overwritten += 1
+            self.item = item
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        """Newest item, or None on close/timeout."""
+        with self.cond:
+            if self.item is None and not self.closed:
+                self.cond.wait(timeout)
+            item, self.item = self.item, None
+            return item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
@@ -0,0 +1,94 @@
+import numpy as np
+import gi
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+MODES = ("alloc", "pool")
+
+
+class GstBufferFactory:
+    """Turns an encoded frame (bytes or a uint8 ndarray) into a Gst.Buffer for appsrc.
+
+    Modes and their per-frame cost for an ndarray from cv2.imencode:
+
+      alloc    tobytes() + Buffer.new_allocate + fill       2 copies, 2 allocations
+      pool     BufferPool.acquire_buffer + write into map    1 copy, no allocation
+               (falls back to fill() where the bindings map read-only)
+
+    ``allocations`` and ``copy_bytes`` count what this factory does, for the
+    per-frame metrics printed by HostRTP.
+    """
+
+    def __init__(self, mode: str = "alloc", max_bytes: int = 0, min_buffers: int = 4):
+        if mode not in MODES:
+            raise ValueError(f"Unknown RTP_BUFFER_MODE: {mode}")
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.frames = 0
+        self.allocations = 0
+        self.copy_bytes = 0
+        self.pool = None
+        self.writable_map = True   # cleared on the first read-only map
+
+        if mode == "pool":
+            self.pool = Gst.BufferPool.new()
+            config = self.pool.get_config()
+            Gst.BufferPool.config_set_params(config, None, max_bytes, min_buffers, 0)
+            self.pool.set_config(config)
+            self.pool.set_active(True)
+
+    def make(self, data):
+        n = len(data)
+        self.frames += 1
+        if self.mode == "pool" and n <= self.max_bytes:
+            return self._from_pool(data, n)
+        return self._allocate(data, n)
+
+    def _allocate(self, data, n):
+        buf = Gst.Buffer.new_allocate(None, n, None)
+        buf.fill(0, self._to_bytes(data))
+        self.allocations += 1
+        self.copy_bytes += n
+        return buf
+
+    def _from_pool(self, data, n):
+        flow, buf = self.pool.acquire_buffer(None)
+        if flow != Gst.FlowReturn.OK:
+            self.mode = "alloc"  # pool flushing or broken; keep streaming
+            return self._allocate(data, n)
+        buf.set_size(n)
+
+        if self.writable_map:
+            ok, info = buf.map(Gst.MapFlags.WRITE)
+            if ok:
+                try:
+                    dst = np.frombuffer(info.data, dtype=np.uint8, count=n)
+                    dst[:] = np.frombuffer(data, dtype=np.uint8, count=n) if isinstance(data, bytes) else data
+                    self.copy_bytes += n
+                    return buf
+                except (TypeError, ValueError):
+                    self.writable_map = False  # read-only memoryview: older gst-python
+                finally:
+                    buf.unmap(info)
+
+        buf.fill(0, self._to_bytes(data))
+        self.copy_bytes += n
+        return buf
+
+    def _to_bytes(self, data):
+        if isinstance(data, bytes):
+            return data
+        self.allocations += 1
+        self.copy_bytes += len(data)
+        return data.tobytes()
+
+    def per_frame(self):
+        """(allocations, copy bytes) per frame since the last call."""
+        frames = max(self.frames, 1)
+        result = (self.allocations / frames, self.copy_bytes / frames)
+        self.frames = self.allocations = self.copy_bytes = 0
+        return result
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.set_active(False)
@@ -1,48 +1,137 @@
 import os
 import time
 import cv2
-import numpy as np
 import threading
-import queue
 import gi
 gi.require_version("Gst", "1.0")
 from gi.repository import Gst
-from multiprocessing import shared_memory
-from multiprocessing import resource_tracker
+import json
+import random
+import socket
+from typing import NamedTuple, Optional
+
 import zmq
 
+from common.msg import frame_topic, recv_latest_frame_msg
+from common.rtp import META_PORT_OFFSET, EncoderOptions, FecEncoder, FrameMeta, RoiMeta, pack_frame_meta, rtp_timestamp, sender_pipeline
+from common.shm import PIXFMT_JPEG, FrameReader
+
+from .control_handler import GATEWAY_CONTROL_ENDPOINT, GATEWAY_CONTROL_TOPIC
+from .encoder_pool import EncoderPool
+from .frame_mailbox import FrameMailbox
+from .gst_buffers import GstBufferFactory
+from .latency import GATEWAY_METRICS_TOPIC, FrameTiming, LatencyMonitor
+from .rate_controller import RateController
+from .roi import RoiComposer
+from .rtp_fanout import MultiUdpFanout, parse_destination, parse_destinations
+from .rtp_pacer import FrameDecimator, RtpPacer
+
 # ---- defaults ----
-FPS = 120 #TODO - get rid of codes dependency on FPS
+# Output frame rate: camera frames are evenly decimated to this (0 = every camera frame)
+OUT_FPS = float(os.getenv("RTP_FPS", "0"))
+# Spread each frame's RTP packets over this fraction of the frame interval (0 = no pacing)
+PACING = float(os.getenv("RTP_PACING", "0"))
+# XOR parity packet per group of up to RTP_FEC_K RTP packets (overhead 1/k), to port + 4; 0 = off
+FEC_K = int(os.getenv("RTP_FEC_K", "0"))
 W = int(os.getenv("RTP_WIDTH", 1280))
 H = int(os.getenv("RTP_HEIGHT", 720))
-Q = 80  # jpeg quality
+Q = 80  # jpeg quality (the rate controller's best quality)
+# Link budget for the adaptive Q/scale/decimation controller; 0 = fixed Q, full size, every frame
+BUDGET_MBPS = float(os.getenv("RTP_BUDGET_MBPS", "0"))
+# FPS text burned into the stream; off allows MJPEG passthrough (no decode/encode)
+OVERLAY = os.getenv("RTP_OVERLAY", "1") != "0"
+# >1: resize/encode on a thread pool with in-order output (1 = inline, as before)
+ENCODE_WORKERS = int(os.getenv("RTP_ENCODE_WORKERS", "1"))
+# appsrc buffer handoff: alloc (new buffer + fill) | pool (reused buffers)
+BUFFER_MODE = os.getenv("RTP_BUFFER_MODE", "alloc")
+# jpeg (rtpjpegpay) | h264 | h265 (software encode of raw frames; receivers must match)
+CODEC = os.getenv("RTP_CODEC", "jpeg")
+ENCODER = EncoderOptions(
+    bitrate_kbps=int(os.getenv("RTP_BITRATE_KBPS", "8000")),
+    keyint=int(os.getenv("RTP_KEYINT", "30")),
+    intra_refresh=os.getenv("RTP_INTRA_REFRESH", "0") != "0",
+    speed_preset=os.getenv("RTP_SPEED_PRESET", "ultrafast"),
+)
 ZMQ_SUB_ENDPOINT = os.getenv("ZMQ_SUB_ENDPOINT", "tcp://localhost:5555")
+# One RTP stream carries one camera: only this camera's notifications are used
+CAMERA_ID = os.getenv("CAMERA_ID", "cam0")
+ZMQ_SUB_TOPIC = os.getenv("ZMQ_SUB_TOPIC", frame_topic(CAMERA_ID).decode())
 RTP_PORT = int(os.getenv("RTP_PORT", "5004"))
-RTP_DST_IP = os.getenv("RTP_DST_IP", "127.0.0.1")
+# One or more receivers, "host[:port],..." (port defaults to RTP_PORT); one encode, unicast to each.
+# Receivers can be added/removed at runtime with RTP_DEST_ADD / RTP_DEST_REMOVE intents.
+# RTP_DST_IP is the older name, still read when RTP_DESTS is unset
+RTP_DESTS = os.getenv("RTP_DESTS", os.getenv("RTP_DST_IP", "127.0.0.1"))
+# ROI mode (JPEG): native-resolution crop + downscaled context, geometry in the per-frame meta
+ROI_ENABLED = os.getenv("RTP_ROI", "0") != "0"
+ROI_W, ROI_H = (int(v) for v in os.getenv("RTP_ROI_SIZE", "640x640").split("x"))
+ROI_CONTEXT_W = int(os.getenv("RTP_ROI_CONTEXT_WIDTH", "320"))
+# Per-stage latency percentiles, published once a second as JSON on GATEWAY_METRICS_TOPIC
+GATEWAY_METRICS_ENDPOINT = os.getenv("GATEWAY_METRICS_ENDPOINT", "tcp://*:5557")
+LATENCY_WINDOW = int(os.getenv("RTP_LATENCY_WINDOW", "1000"))  # frames
+
+
+class EncodedFrame(NamedTuple):
+    payload: object              # JPEG bytes/ndarray, or raw BGR for H.26x
+    frame_id: int
+    t_capture_ns: int            # camera capture, host CLOCK_MONOTONIC
+    timing: FrameTiming
+    roi: Optional[RoiMeta] = None
+
 
 class HostRTP:
     def __init__(self):
-        self.MAX_HEIGHT = 4320
-        self.MAX_WIDTH  = 7680
-        self.shm=None
-        self.frame_queue = queue.Queue(maxsize=1)  # Keep only the last frame in the queue
+        self.reader = FrameReader()
+        self.mailbox = FrameMailbox()  # latest frame only; wakes the encoder on each new one
+        self.superseded = 0            # notifications drained unread behind a newer one
         self.stop_event = threading.Event()
         Gst.init(None)
         self.setup_pipeline()
+        # A JPEG never needs more than the raw frame it encodes; H.26x pushes exactly one raw frame
+        self.buffers = GstBufferFactory(BUFFER_MODE, max_bytes=W * H * 3)
+
+        # JPEG: Q/scale/decimation ladder. H.26x: the budget sets the encoder bitrate instead
+        self.rate = RateController(BUDGET_MBPS if CODEC == "jpeg" else 0, q_max=Q)
+        if CODEC != "jpeg" and BUDGET_MBPS > 0:
+            self.set_encoder_bitrate(BUDGET_MBPS)
+
+        self.roi = RoiComposer(ROI_W, ROI_H, ROI_CONTEXT_W)
+        self.roi.enabled = ROI_ENABLED and CODEC == "jpeg"
+        self.meta_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.meta_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        self.tx_count = 0
+        self.tx_last = time.time()
+        self.tx_fps = None
+        self.latency = LatencyMonitor(LATENCY_WINDOW)
+        self.encoder = None
+        if ENCODE_WORKERS > 1:
+            self.encoder = EncoderPool(self.encode_view, self.push_frame, workers=ENCODE_WORKERS)
 
         self.context = zmq.Context()
         self.sub_socket = self.context.socket(zmq.SUB)
         self.sub_socket.connect(ZMQ_SUB_ENDPOINT)
-        self.sub_socket.setsockopt_string(zmq.SUBSCRIBE, "")
-        self.sub_socket.RCVTIMEO = 200
+        self.sub_socket.setsockopt_string(zmq.SUBSCRIBE, ZMQ_SUB_TOPIC)
+        self.poller = zmq.Poller()
+        self.poller.register(self.sub_socket, zmq.POLLIN)
+
+        # Control intents forwarded by the UDP receiver process
+        self.control_socket = self.context.socket(zmq.SUB)
+        self.control_socket.connect(GATEWAY_CONTROL_ENDPOINT)
+        self.control_socket.setsockopt(zmq.SUBSCRIBE, GATEWAY_CONTROL_TOPIC)
+        self.control_socket.RCVTIMEO = 200
+
+        self.metrics_socket = self.context.socket(zmq.PUB)
+        self.metrics_socket.bind(GATEWAY_METRICS_ENDPOINT)
 
     def run(self):
 
         zmq_thread = threading.Thread(target=self.zmq_sub_loop)
         process_thread = threading.Thread(target=self.process_frames)
+        control_thread = threading.Thread(target=self.control_loop)
     
         zmq_thread.start()    
         process_thread.start()
+        control_thread.start()
     
         try:
             while not self.stop_event.is_set():
@@ -50,135 +139,320 @@ class HostRTP:
         finally:
             # ---- coordinated shutdown ----
             zmq_thread.join()
+            control_thread.join()
+
+            self.mailbox.close()
 
             process_thread.join()
+            if self.encoder is not None:
+                self.encoder.close()
     
             self.appsrc.emit("end-of-stream")
             self.pipeline.set_state(Gst.State.NULL)
+            if self.pacer is not None:
+                self.pacer.close()
+            self.buffers.close()
 
-            if self.shm is not None:
-                self.shm.close()
+            self.reader.close()
             
             self.sub_socket.close()
+            self.control_socket.close()
+            self.metrics_socket.close()
+            self.meta_socket.close()
             self.context.term()
 
-    def setup_pipeline(self, port: int = RTP_PORT, dst_ip: str = RTP_DST_IP, fps: int = FPS):
-        self.port   = port
-        self.dst_ip = dst_ip
-        self.fps    = fps
-
-        
-        pipeline_str = (
-            f"appsrc name=src is-live=true block=false format=time do-timestamp=true "
-            f"caps=image/jpeg,width={W},height={H},framerate={fps}/1 ! "
-            f"rtpjpegpay pt=26 ! "
-            f"udpsink host={dst_ip} port={port} sync=false async=false"
-        )
+    def setup_pipeline(self, destinations: str = RTP_DESTS, fps: float = OUT_FPS):
+        self.fps = fps
+
+        # Pacing and FEC need the packets in Python: payloader -> appsink -> RtpPacer
+        packet_path = PACING > 0 or FEC_K > 0
+        if packet_path:
+            sink = "appsink name=rtpsink sync=false emit-signals=false max-buffers=0 drop=false"
+        else:
+            # clients are added through the fan-out (also at runtime)
+            sink = "multiudpsink name=rtpsink sync=false async=false"
+        # PTS comes from the camera capture time (next_pts), not the appsrc clock, and the
+        # RTP timestamp base is ours, so each frame's RTP timestamp is known for its FrameMeta
+        self.rtp_ts_offset = random.getrandbits(32)
+        pipeline_str = sender_pipeline(CODEC, W, H, int(round(fps)), ENCODER, sink=sink,
+                                       do_timestamp=False, timestamp_offset=self.rtp_ts_offset)
+        print(f"[TX] {pipeline_str}")
     
         self.pipeline = Gst.parse_launch(pipeline_str)
         self.appsrc   = self.pipeline.get_by_name("src")
+        self.encoder_element = self.pipeline.get_by_name("enc")  # None for JPEG
+        self.pacer = None
+        dests = parse_destinations(destinations, RTP_PORT)
+        if packet_path:
+            fec = FecEncoder(FEC_K) if FEC_K > 0 else None
+            self.pacer = RtpPacer(self.pipeline.get_by_name("rtpsink"), dests, fps, PACING, fec)
+            self.fanout = self.pacer
+        else:
+            self.fanout = MultiUdpFanout(self.pipeline.get_by_name("rtpsink"), dests)
         self.pipeline.set_state(Gst.State.PLAYING)
 
-    def process_frames(self):
+        self.decimator = FrameDecimator(fps)
+        self.pts_base_ns = None
+        self.last_pts = -1
 
-        count = 0
-        last = time.time()
-        fps = None   
-        while not self.stop_event.is_set():
-            try: 
-                # Block until a frame is available or timeout occurs
-                frame_bgr = self.frame_queue.get(timeout=0.1)
+    def set_encoder_bitrate(self, mbps: float):
+        """H.26x: retarget the encoder to ~90% of the link budget (bitrate is mutable while playing)."""
+        if self.encoder_element is None or mbps <= 0:
+            return
+        kbps = max(int(mbps * 1000 * 0.9), 100)
+        self.encoder_element.set_property("bitrate", kbps)
+        print(f"[TX] {CODEC} bitrate {kbps} kbps")
 
-            except queue.Empty: 
-                # Timeout Occurred; check exit_flag or perform other tasks
+    def process_frames(self):
+        while not self.stop_event.is_set():
+            # Sleeps until the notify thread posts a newer frame (or shutdown closes the mailbox)
+            item = self.mailbox.get()
+            if item is None:
                 continue
-            # Convert BGR -> RGBA
-            if False:
-                frame = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGBA)
-            else:
-                frame = frame_bgr
+            view, timing = item
 
+            if not self.decimator.admit(view.t_capture_ns):
+                continue  # even decimation to RTP_FPS
+            if not self.rate.admit():
+                continue  # frame decimation from the rate controller
 
- 
-    
-            # Send Frames
-            frame = cv2.resize(frame, (W, H), interpolation=cv2.INTER_LINEAR)
-
-            # FPS
-            count += 1
-            now = time.time()
-            if now - last >= 1.0:
-                fps = count / (now - last)
-                print(f"[TX] FPS={fps:.1f}")
-                count = 0
-                last = now   
-
-            if True and fps:
-                cv2.putText(
-                    frame, f"FPS: {fps:.1f}", (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.0,
-                    (255, 255, 255), 2, cv2.LINE_AA
-                )
-            ok, jpg = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), Q])
-            if not ok: continue
-            data = jpg.tobytes()
-        
-            buf = Gst.Buffer.new_allocate(None, len(data), None)
-            buf.fill(0, data)
-            
-            # optional-but-safe: stamp timing from your loop count (prevents weird pacing)
-            buf.pts = Gst.util_uint64_scale(count, Gst.SECOND, FPS)
-            buf.duration = Gst.util_uint64_scale(1, Gst.SECOND, FPS)
-            
-            flow = self.appsrc.emit("push-buffer", buf)
-            if flow != Gst.FlowReturn.OK:
-                print(f"[TX] push-buffer flow={flow}")
-                self.stop_event.set()
+            if self.encoder is not None:
+                self.encoder.submit((view, timing))  # ordered output via push_frame on the pool's emitter
+                continue
+
+            item = self.encode_view((view, timing))
+            if item is not None and not self.push_frame(item):
                 break
 
+    def encode_view(self, job):
+        """(SHM frame view, FrameTiming) -> EncodedFrame, or None to skip the frame.
 
+        Runs on the process thread, or on an EncoderPool worker (RTP_ENCODE_WORKERS > 1).
+        """
+        view, timing = job
+        timing.mark("queue")  # notify -> start of work, including any wait for a pool worker
+        setting = self.rate.setting
+
+        # MJPEG passthrough: camera JPEG already matches the stream, push it untouched
+        if (CODEC == "jpeg" and view.pixfmt == PIXFMT_JPEG and not OVERLAY and (view.width, view.height) == (W, H)
+                and setting is self.rate.ladder[0] and not self.roi.enabled):
+            data = view.image.tobytes()
+            timing.mark("read")
+            if not self.reader.is_valid(view):
+                return None
+            return EncodedFrame(data, view.frame_id, view.t_capture_ns, timing)
+
+        if view.pixfmt == PIXFMT_JPEG:
+            frame = cv2.imdecode(view.image, cv2.IMREAD_COLOR)
+            if frame is None:
+                return None  # corrupt, or torn by the camera reusing the slot
+            timing.mark("read")
+        # Convert BGR -> RGBA
+        elif False:
+            frame = cv2.cvtColor(view.image, cv2.COLOR_BGR2RGBA)
+        else:
+            frame = view.image
+
+        roi_meta = None
+        if self.roi.enabled and CODEC == "jpeg":
+            # Crop stays native; only the context image is scaled
+            frame, roi_meta = self.roi.compose(frame, view.frame_id)
+        else:
+            # Send Frames -- resize reads straight from SHM and yields our own buffer
+            size = (W, H) if setting.scale == 1.0 else (int(W * setting.scale) & ~1, int(H * setting.scale) & ~1)
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+        if not self.reader.is_valid(view):
+            return None  # camera reused the slot while we were reading it
+        timing.mark("resize")  # raw SHM frames are read by the resize itself
+
+        fps = self.tx_fps
+        if OVERLAY and fps:
+            cv2.putText(
+                frame, f"FPS: {fps:.1f}", (10, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.0,
+                (255, 255, 255), 2, cv2.LINE_AA
+            )
+            timing.mark("overlay")
+        if CODEC != "jpeg":
+            if frame.ndim == 2:
+                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+            # H.26x encodes on the GStreamer streaming thread, outside these stages
+            # raw BGR at W x H for the H.26x encoder
+            return EncodedFrame(frame.reshape(-1), view.frame_id, view.t_capture_ns, timing)
+        ok, jpg = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), setting.quality])
+        if not ok:
+            return None
+        timing.mark("encode")
+        # copied once, into the Gst buffer
+        return EncodedFrame(jpg.reshape(-1), view.frame_id, view.t_capture_ns, timing, roi_meta)
+
+    def push_frame(self, frame: EncodedFrame) -> bool:
+        """Send the frame's meta and push it to appsrc; count it for the FPS/latency readout and rate control."""
+        pts = self.next_pts(frame.t_capture_ns)
+        self.send_frame_meta(frame, pts)
+        if not self.push_buffer(frame.payload, pts):
+            return False
+        frame.timing.mark("push")
+        self.latency.record(frame.timing)
+
+        self.rate.on_frame(len(frame.payload))
+        self.tx_count += 1
+        now = time.time()
+        if now - self.tx_last >= 1.0:
+            self.tx_fps = self.tx_count / (now - self.tx_last)
+            print(f"[TX] FPS={self.tx_fps:.1f}")
+            if self.encoder is not None:
+                pool = self.encoder
+                print(f"[TX] encoder: emitted={pool.emitted} dropped={pool.dropped} skipped={pool.skipped}")
+            print(f"[TX] notify: superseded={self.superseded} overwritten={self.mailbox.overwritten}")
+            if self.rate.enabled:
+                print(f"[TX] rate: {self.rate.measured_bps / 1e6:.1f} Mbps, {self.rate.setting}")
+            if self.pacer is not None:
+                print(f"[TX] pacer: frames={self.pacer.frames_sent} packets={self.pacer.packets_sent} "
+                      f"unpaced={self.pacer.flushed} fec={self.pacer.fec_sent}")
+            for host, port, packets, nbytes in self.fanout.stats():
+                print(f"[TX] -> {host}:{port} packets={packets} bytes={nbytes}")
+            allocs, copied = self.buffers.per_frame()
+            print(f"[TX] buffers ({self.buffers.mode}): {allocs:.2f} allocs/frame, {copied / 1024:.1f} KiB copied/frame")
+            self.report_latency()
+            self.tx_count = 0
+            self.tx_last = now
+        return True
+
+    def report_latency(self):
+        """Print p50/p95/p99 per stage (ms) and publish them on the metrics topic."""
+        snapshot = self.latency.snapshot()
+        print(f"[TX] latency ms p50/p95/p99: {LatencyMonitor.format(snapshot)}")
+        payload = LatencyMonitor.to_json(snapshot, fps=round(self.tx_fps, 1), codec=CODEC)
+        try:
+            self.metrics_socket.send_multipart([GATEWAY_METRICS_TOPIC, payload], zmq.NOBLOCK)
+        except zmq.Again:
+            pass
+
+    def next_pts(self, t_capture_ns: int) -> int:
+        """PTS = capture time relative to the first frame, so the RTP timestamps
+        reflect when frames were captured, not when they were encoded."""
+        if self.pts_base_ns is None:
+            self.pts_base_ns = t_capture_ns
+        pts = max(t_capture_ns - self.pts_base_ns, self.last_pts + 1)
+        self.last_pts = pts
+        return pts
+
+    def send_frame_meta(self, frame: EncodedFrame, pts: int):
+        """frame_id + capture time keyed by the RTP timestamp the frame's packets will carry."""
+        t_capture_unix_ns = 0
+        if frame.t_capture_ns:
+            t_capture_unix_ns = frame.t_capture_ns + time.time_ns() - time.monotonic_ns()
+        packet = pack_frame_meta(FrameMeta(frame.frame_id, rtp_timestamp(pts, self.rtp_ts_offset),
+                                           t_capture_unix_ns, frame.roi))
+        # Each receiver gets it next to its own RTP port (a GCS on 5004 listens on 5006)
+        for host, port in self.fanout.destinations():
+            try:
+                self.meta_socket.sendto(packet, (host, port + META_PORT_OFFSET))
+            except OSError:
+                pass  # best effort, like the video itself
+
+    def push_buffer(self, data, pts: int) -> bool:
+        buf = self.buffers.make(data)
+        buf.pts = pts
+        if self.decimator.period_ns:
+            buf.duration = self.decimator.period_ns
+
+        flow = self.appsrc.emit("push-buffer", buf)
+        if flow != Gst.FlowReturn.OK:
+            print(f"[TX] push-buffer flow={flow}")
+            self.stop_event.set()
+            return False
+        return True
+
+    def control_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                _, payload = self.control_socket.recv_multipart()
+            except zmq.Again:
+                continue
+            try:
+                intent = json.loads(payload)
+            except ValueError as e:
+                print(f"[TX] bad control message: {e}")
+                continue
+            kind = intent.get("type")
+            if kind == "RATE_BUDGET":
+                try:
+                    if CODEC == "jpeg":
+                        self.rate.set_budget(float(intent.get("value") or 0))
+                    else:
+                        self.set_encoder_bitrate(float(intent.get("value") or 0))
+                except (TypeError, ValueError):
+                    print(f"[TX] bad RATE_BUDGET value: {intent.get('value')!r}")
+            elif kind == "ROI":
+                self.handle_roi_intent(intent.get("value"))
+            elif kind in ("RTP_DEST_ADD", "RTP_DEST_REMOVE"):
+                self.handle_dest_intent(kind, intent.get("value"))
+
+    def handle_dest_intent(self, kind: str, value):
+        """Value "host[:port]": start or stop sending the stream there (no re-encode, no restart)."""
+        try:
+            host, port = parse_destination(value, RTP_PORT)
+        except (TypeError, ValueError):
+            print(f"[TX] bad {kind} value: {value!r}")
+            return
+        if kind == "RTP_DEST_ADD":
+            changed = self.fanout.add(host, port)
+        else:
+            changed = self.fanout.remove(host, port)
+        print(f"[TX] {kind} {host}:{port}{'' if changed else ' (no change)'}; "
+              f"receivers: {', '.join(f'{h}:{p}' for h, p in self.fanout.destinations()) or 'none'}")
+
+    def handle_roi_intent(self, value):
+        """ROI value: "x,y" (camera pixels) centres the crop there; "off" returns to full frame."""
+        if CODEC != "jpeg":
+            print("[TX] ROI mode needs RTP_CODEC=jpeg (H.26x caps are fixed)")
+            return
+        if value in (None, "", "off"):
+            self.roi.disable()
+            print("[TX] ROI off")
+            return
+        try:
+            x, y = (float(v) for v in str(value).split(","))
+        except ValueError:
+            print(f"[TX] bad ROI value: {value!r}")
+            return
+        self.roi.set_center(x, y)
+        print(f"[TX] ROI centre {x:.0f},{y:.0f}")
 
-    
     def signal_handler(self, sig, frame):
         print("\nGraceful exit initiated.")
         self.stop_event.set()
 
     def zmq_sub_loop(self):
-
-        
         while not self.stop_event.is_set():
+            # Wakes as soon as a notification arrives; the timeout only bounds shutdown
+            if not self.poller.poll(200):
+                continue
             try:
-                msg = self.sub_socket.recv_json()
+                # Newest committed frame only; older queued notifications are never read from SHM
+                _, msg, skipped = recv_latest_frame_msg(self.sub_socket, zmq.NOBLOCK, ZMQ_SUB_TOPIC.encode())
             except zmq.Again:
                 continue
+            except ValueError as e:
+                print(f"[TX] bad frame message: {e}")
+                continue
+            self.superseded += skipped
 
-            self.width    = msg["width"]
-            self.height   = msg["height"]
-            self.channels = msg["channels"]
-            self.shm_name = msg["shm_name"]
-
-            # First frame: attach to SHM
-            if self.shm is None:
-                self.shm = shared_memory.SharedMemory(name=self.shm_name)
-                resource_tracker.unregister(self.shm._name, "shared_memory")
-                self.frame_buf = np.ndarray(
-                    (self.MAX_HEIGHT, self.MAX_WIDTH, self.channels),  # Use instance vars here
-                    dtype=np.uint8,
-                    buffer=self.shm.buf[: self.MAX_WIDTH * self.MAX_HEIGHT * self.channels]
-                )
-
-            # Read latest frame (copy semantics preserved)
-            frame = self.frame_buf[:self.height, :self.width, :self.channels].copy()
-
-            # TEMP: feed into existing RTP path
-            try:
-                self.frame_queue.put_nowait(frame)
-            except queue.Full:
-                try:
-                    self.frame_queue.get_nowait()
-                except queue.Empty:
-                    pass
-                self.frame_queue.put_nowait(frame)
+            # Attach on the first frame, re-map when the camera changes mode
+            if not self.reader.attach(msg.shm_name, msg.generation):
+                continue
+
+            timing = FrameTiming(msg.t_capture_ns)
+
+            # Zero-copy view of the notified slot; validated after process_frames reads it
+            frame = self.reader.read(msg.slot)
+            if frame is None:
+                continue
+
+            # Replaces a frame the encoder has not started yet; nothing is copied either way
+            self.mailbox.put((frame, timing))
 
 
 
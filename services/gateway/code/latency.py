@@ -0,0 +1,73 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+GATEWAY_METRICS_TOPIC = b"gateway.metrics"
+
+# Stages in path order; a frame only records the stages it went through
+# (e.g. MJPEG passthrough has no resize/overlay/encode).
+STAGES = ("notify", "queue", "read", "resize", "overlay", "encode", "push", "total")
+
+
+class FrameTiming:
+    """Per-frame stage clock, started when the frame's ZMQ notify is received.
+
+    ``mark(stage)`` records the time since the previous mark. Times are
+    CLOCK_MONOTONIC, the clock the camera stamps ``t_capture_ns`` with, so
+    ``notify`` (capture -> notify receipt) is comparable across containers
+    on the same host.
+    """
+
+    __slots__ = ("t_start", "t_last", "marks")
+
+    def __init__(self, t_capture_ns: int = 0):
+        now = time.monotonic_ns()
+        self.t_start = now
+        self.t_last = now
+        self.marks = []
+        if t_capture_ns and t_capture_ns <= now:
+            self.marks.append(("notify", now - t_capture_ns))
+
+    def mark(self, stage: str):
+        now = time.monotonic_ns()
+        self.marks.append((stage, now - self.t_last))
+        self.t_last = now
+
+
+class LatencyMonitor:
+    """Rolling per-stage latency percentiles over the last ``window`` frames.
+
+    Fed from the one thread that pushes frames (push_frame), read from the
+    same thread at each report, so it needs no lock.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.samples = {stage: deque(maxlen=window) for stage in STAGES}
+
+    def record(self, timing: FrameTiming):
+        for stage, ns in timing.marks:
+            self.samples[stage].append(ns)
+        self.samples["total"].append(timing.t_last - timing.t_start)
+
+    def snapshot(self):
+        """{stage: {"n", "p50", "p95", "p99", "max"}} in milliseconds, for stages with samples."""
+        result = {}
+        for stage in STAGES:
+            values = self.samples[stage]
+            if not values:
+                continue
+            ms = np.fromiter(values, dtype=np.float64, count=len(values)) / 1e6
+            p50, p95, p99 = np.percentile(ms, (50, 95, 99))
+            result[stage] = {"n": len(ms), "p50": round(p50, 3), "p95": round(p95, 3),
+                             "p99": round(p99, 3), "max": round(ms.max(), 3)}
+        return result
+
+    @staticmethod
+    def format(snapshot) -> str:
+        return " ".join(f"{stage}={s['p50']:.2f}/{s['p95']:.2f}/{s['p99']:.2f}" for stage, s in snapshot.items())
+
+    @staticmethod
+    def to_json(snapshot, **extra) -> bytes:
+        return json.dumps({**extra, "stages": snapshot}).encode()
@@ -0,0 +1,154 @@
+import threading
+import time
+
+# JPEG size relative to Q=80 for typical scenes; only ratios matter, and the
+# controller re-calibrates against the measured rate at every update.
+_Q_SIZE = {40: 0.45, 50: 0.55, 60: 0.65, 70: 0.8, 80: 1.0, 90: 1.5, 95: 2.2}
+
+
+def _q_size(q: int) -> float:
+    keys = sorted(_Q_SIZE)
+    if q <= keys[0]:
+        return _Q_SIZE[keys[0]]
+    for lo, hi in zip(keys, keys[1:]):
+        if q <= hi:
+            return _Q_SIZE[lo] + (_Q_SIZE[hi] - _Q_SIZE[lo]) * (q - lo) / (hi - lo)
+    return _Q_SIZE[keys[-1]]
+
+
+class RateSetting:
+    __slots__ = ("quality", "scale", "decimation")
+
+    def __init__(self, quality: int, scale: float, decimation: int):
+        self.quality = quality
+        self.scale = scale
+        self.decimation = decimation
+
+    @property
+    def relative_size(self) -> float:
+        """Bytes per second relative to (Q=80, full size, every frame)."""
+        return _q_size(self.quality) * self.scale * self.scale / self.decimation
+
+    def __repr__(self):
+        return f"Q={self.quality} scale={self.scale} 1/{self.decimation}"
+
+
+class RateController:
+    """Steers JPEG quality, output scale and frame decimation toward a bitrate budget.
+
+    Settings form a ladder in order of preference: keep every frame first,
+    then full resolution, then the highest quality. Every ``interval`` the
+    measured output rate is compared with the budget; the controller moves to
+    the best rung predicted to fit (the prediction is scaled from the current
+    rung's measured rate).
+
+    Hysteresis: it steps down as soon as the link is over ``high`` x budget,
+    but steps up only when the better rung is predicted under ``low`` x budget
+    and the link has been calm for ``hold`` seconds. A step up that has to be
+    undone doubles the hold (up to ``max_hold``), so a rung that does not fit
+    is not retried every few seconds.
+
+    ``budget_mbps <= 0`` disables control: the first rung (``q_max``, full
+    size, every frame) is used throughout.
+    """
+
+    def __init__(self, budget_mbps: float = 0.0, q_max: int = 80, q_min: int = 40, q_step: int = 10,
+                 scales=(1.0, 0.75, 0.5), decimations=(1, 2, 3, 4),
+                 interval: float = 0.5, low: float = 0.75, high: float = 0.95, hold: float = 2.0,
+                 max_hold: float = 30.0):
+        qualities = list(range(q_max, q_min - 1, -q_step))
+        self.ladder = [RateSetting(q, s, d) for d in decimations for s in scales for q in qualities]
+        self.interval = interval
+        self.low = low
+        self.high = high
+        self.hold = hold
+        self.base_hold = hold
+        self.max_hold = max_hold
+        self.last_up = False
+
+        self.lock = threading.Lock()
+        self.budget_bps = budget_mbps * 1e6
+        self.index = 0
+        self.setting = self.ladder[0]
+        self.bytes = 0
+        self.frames_in = 0
+        self.t_window = time.monotonic()
+        self.t_change = self.t_window
+        self.measured_bps = 0.0
+        self.changes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_bps > 0
+
+    def set_budget(self, mbps: float):
+        with self.lock:
+            self.budget_bps = float(mbps) * 1e6
+            if not self.enabled:
+                self.index = 0
+                self.setting = self.ladder[0]
+        print(f"[RATE] budget {mbps} Mbps")
+
+    def admit(self) -> bool:
+        """Called per source frame; False if decimation drops it."""
+        self.frames_in += 1
+        return self.frames_in % self.setting.decimation == 0
+
+    def on_frame(self, nbytes: int):
+        """Called per sent frame with its encoded size."""
+        self.bytes += nbytes
+        now = time.monotonic()
+        elapsed = now - self.t_window
+        if elapsed >= self.interval:
+            self.measured_bps = self.bytes * 8 / elapsed
+            self.bytes = 0
+            self.t_window = now
+            if self.enabled:
+                self.update(now)
+
+    def update(self, now: float):
+        with self.lock:
+            budget = self.budget_bps
+            current = self.setting
+            measured = self.measured_bps
+            if measured <= 0 or budget <= 0:
+                return
+
+            def predicted(setting):
+                return measured * setting.relative_size / current.relative_size
+
+            # Best rung predicted to fit, from the top of the ladder
+            target = len(self.ladder) - 1
+            for i, setting in enumerate(self.ladder):
+                if predicted(setting) <= budget * self.high:
+                    target = i
+                    break
+
+            if now - self.t_change >= self.hold * 2:
+                self.hold = self.base_hold                 # settled: forget past failures
+
+            if measured > budget * self.high and target > self.index:
+                new = target                               # over budget: step down now
+                if self.last_up:
+                    self.hold = min(self.hold * 2, self.max_hold)
+            elif target < self.index and now - self.t_change >= self.hold:
+                # Step up only to a rung with real headroom
+                new = self.index
+                for i in range(target, self.index):
+                    if predicted(self.ladder[i]) <= budget * self.low:
+                        new = i
+                        break
+            else:
+                return
+            if new == self.index:
+                return
+
+            self.last_up = new < self.index
+            self.index = new
+            self.setting = self.ladder[new]
+            self.t_change = now
+            self.changes += 1
+            # Next measurement must see only the new setting
+            self.bytes = 0
+            self.t_window = now
+        print(f"[RATE] {measured / 1e6:.1f}/{budget / 1e6:.1f} Mbps -> {self.setting}")
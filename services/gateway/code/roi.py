@@ -0,0 +1,64 @@
+import threading
+
+import cv2
+import numpy as np
+
+from common.rtp import RoiMeta
+
+
+class RoiComposer:
+    """Builds ROI-mode frames: a native-resolution crop plus a small full-frame context.
+
+    Layout (one image, so it rides the existing RTP stream):
+
+        +-----------------+---------+
+        |                 | context |
+        |   crop (1:1)    +---------+
+        |                 |  black  |
+        +-----------------+---------+
+
+    The crop is centred on the commanded point (camera pixels), clamped to
+    stay inside the frame. With no point set it is centred on the frame.
+    """
+
+    def __init__(self, roi_w: int = 640, roi_h: int = 640, context_w: int = 320):
+        self.roi_w = roi_w
+        self.roi_h = roi_h
+        self.context_w = context_w
+        self.lock = threading.Lock()
+        self.enabled = False
+        self.center = None   # (x, y) in camera pixels, None = frame centre
+
+    def set_center(self, x: float, y: float):
+        with self.lock:
+            self.center = (x, y)
+            self.enabled = True
+
+    def disable(self):
+        with self.lock:
+            self.enabled = False
+
+    def compose(self, image, frame_id: int):
+        """Return (composite BGR image, RoiMeta). Reads ``image`` (possibly an SHM view) once."""
+        src_h, src_w = image.shape[:2]
+        with self.lock:
+            center = self.center
+
+        w = min(self.roi_w, src_w) & ~1
+        h = min(self.roi_h, src_h) & ~1
+        cx, cy = center if center is not None else (src_w / 2, src_h / 2)
+        x = int(min(max(cx - w / 2, 0), src_w - w))
+        y = int(min(max(cy - h / 2, 0), src_h - h))
+
+        ctx_w = self.context_w & ~1
+        ctx_h = max(int(round(src_h * ctx_w / src_w)) & ~1, 2)
+
+        canvas = np.zeros((max(h, ctx_h), w + ctx_w, 3), dtype=np.uint8)
+        crop = image[y:y + h, x:x + w]
+        if crop.ndim == 2:
+            crop = crop[:, :, None]
+        canvas[:h, :w] = crop
+        canvas[:ctx_h, w:] = cv2.resize(image, (ctx_w, ctx_h), interpolation=cv2.INTER_AREA).reshape(ctx_h, ctx_w, -1)
+
+        meta = RoiMeta(frame_id, src_w, src_h, x, y, w, h, w, 0, ctx_w, ctx_h)
+        return canvas, meta
@@ -0,0 +1,67 @@
+import threading
+
+
+def parse_destination(value: str, default_port: int):
+    """"host" or "host:port" -> (host, port)."""
+    host, _, port = str(value).strip().partition(":")
+    if not host:
+        raise ValueError(f"bad RTP destination: {value!r}")
+    return host, int(port) if port else default_port
+
+
+def parse_destinations(value: str, default_port: int):
+    """Comma-separated RTP_DESTS -> [(host, port), ...], duplicates removed."""
+    dests = []
+    for item in str(value).split(","):
+        if item.strip():
+            dst = parse_destination(item, default_port)
+            if dst not in dests:
+                dests.append(dst)
+    return dests
+
+
+class MultiUdpFanout:
+    """Unicast fan-out of the one encoded RTP stream through a ``multiudpsink``.
+
+    The payloader output is encoded once and the sink sends each packet to
+    every client, so another receiver costs a sendto per packet, not another
+    encode. Clients are added/removed while playing; byte and packet counts
+    come from the sink's own per-client stats.
+    """
+
+    def __init__(self, sink, destinations=()):
+        self.sink = sink
+        self.lock = threading.Lock()
+        self.dests = []
+        for host, port in destinations:
+            self.add(host, port)
+
+    def destinations(self):
+        with self.lock:
+            return list(self.dests)
+
+    def add(self, host: str, port: int) -> bool:
+        with self.lock:
+            if (host, port) in self.dests:
+                return False
+            self.sink.emit("add", host, port)
+            self.dests.append((host, port))
+        return True
+
+    def remove(self, host: str, port: int) -> bool:
+        with self.lock:
+            if (host, port) not in self.dests:
+                return False
+            self.sink.emit("remove", host, port)
+            self.dests.remove((host, port))
+        return True
+
+    def stats(self):
+        """[(host, port, packets, bytes), ...] since each client was added."""
+        result = []
+        for host, port in self.destinations():
+            s = self.sink.emit("get-stats", host, port)
+            if s is None:
+                continue
+            result.append((host, port, s.get_value("packets-sent"), s.get_value("bytes-sent")))
+        return result
@@ -0,0 +1,192 @@
+import socket
+import threading
+import time
+from collections import deque
+
+import gi
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+
+from common.rtp import FEC_PORT_OFFSET
+
+
+class FrameDecimator:
+    """Even output-rate decimation driven by capture timestamps.
+
+    Keeps a frame when its capture time reaches the next output slot, so a
+    120 fps camera at ``fps=30`` yields every 4th frame, and a jittery or
+    non-integer ratio (e.g. 50 -> 30) still comes out evenly spaced.
+    ``fps <= 0`` keeps every frame.
+    """
+
+    def __init__(self, fps: float):
+        self.period_ns = int(1e9 / fps) if fps > 0 else 0
+        self.next_ns = None
+        self.kept = 0
+        self.skipped = 0
+
+    def admit(self, t_capture_ns: int) -> bool:
+        if self.period_ns == 0:
+            return True
+        # Half a period of tolerance so capture jitter can't skip a slot
+        if self.next_ns is not None and t_capture_ns < self.next_ns - self.period_ns // 2:
+            self.skipped += 1
+            return False
+        if self.next_ns is None or t_capture_ns - self.next_ns > self.period_ns:
+            self.next_ns = t_capture_ns    # first frame, or fell behind: restart the grid
+        self.next_ns += self.period_ns
+        self.kept += 1
+        return True
+
+
+class RtpPacer:
+    """Sends the RTP packets of each frame spread over the frame interval.
+
+    The payloader's output goes to an appsink instead of udpsink. Packets are
+    grouped into frames by the RTP marker bit, then sent ``spread`` x frame
+    interval apart in total rather than back to back, so the radio sees a
+    steady packet rate instead of one burst per frame. If a newer frame is
+    already waiting, the current one is flushed without pacing: pacing must
+    never add queueing latency.
+
+    Every packet goes to each destination (unicast fan-out); destinations
+    are added/removed while running, with the same interface and per-client
+    counters as ``MultiUdpFanout``.
+
+    With a ``fec`` encoder (common.rtp.FecEncoder) each parity packet is sent
+    right after its group, to the destination's port + FEC_PORT_OFFSET.
+    """
+
+    MIN_GAP = 100e-6  # below this, sleeping costs more than it smooths
+
+    def __init__(self, appsink, destinations, fps: float = 0.0, spread: float = 0.8, fec=None):
+        self.appsink = appsink
+        self.fec = fec
+        self.lock = threading.Lock()
+        self.dests = ()          # replaced, never mutated, so the send loop needs no lock
+        self.counters = {}       # (host, port) -> [packets, bytes]
+        for host, port in destinations:
+            self.add(host, port)
+        self.frame_interval = 1.0 / fps if fps > 0 else 0.0
+        self.spread = spread
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        self.frames = deque()
+        self.ready = threading.Event()
+        self.stop_event = threading.Event()
+        self.last_frame_t = None
+        self.interval_ewma = self.frame_interval
+
+        self.frames_sent = 0
+        self.packets_sent = 0
+        self.flushed = 0     # frames sent unpaced because the next one was waiting
+        self.fec_sent = 0
+
+        self.threads = [
+            threading.Thread(target=self._pull_loop, daemon=True),
+            threading.Thread(target=self._send_loop, daemon=True),
+        ]
+        for t in self.threads:
+            t.start()
+
+    def destinations(self):
+        return list(self.dests)
+
+    def add(self, host: str, port: int) -> bool:
+        with self.lock:
+            if (host, port) in self.dests:
+                return False
+            self.counters[(host, port)] = [0, 0]
+            self.dests = self.dests + ((host, port),)
+        return True
+
+    def remove(self, host: str, port: int) -> bool:
+        with self.lock:
+            if (host, port) not in self.dests:
+                return False
+            self.dests = tuple(d for d in self.dests if d != (host, port))
+            del self.counters[(host, port)]
+        return True
+
+    def stats(self):
+        """[(host, port, packets, bytes), ...] since each destination was added."""
+        with self.lock:
+            return [(host, port, *self.counters[(host, port)]) for host, port in self.dests]
+
+    def close(self):
+        self.stop_event.set()
+        self.ready.set()
+        for t in self.threads:
+            t.join()
+        self.sock.close()
+
+    def _pull_loop(self):
+        packets = []
+        while not self.stop_event.is_set():
+            sample = self.appsink.emit("try-pull-sample", 100 * Gst.MSECOND)
+            if sample is None:
+                continue
+            buffers = sample.get_buffer_list()
+            if buffers is not None:
+                buffers = [buffers.get(i) for i in range(buffers.length())]
+            else:
+                buffers = [sample.get_buffer()]
+
+            for buf in buffers:
+                packet = buf.extract_dup(0, buf.get_size())
+                packets.append(packet)
+                if len(packet) > 1 and packet[1] & 0x80:  # marker: last packet of the frame
+                    self._frame_done(packets)
+                    packets = []
+
+    def _frame_done(self, packets):
+        now = time.monotonic()
+        if self.frame_interval == 0.0 and self.last_frame_t is not None:
+            # No configured rate: follow the observed frame interval
+            dt = now - self.last_frame_t
+            self.interval_ewma = dt if self.interval_ewma == 0.0 else self.interval_ewma + 0.1 * (dt - self.interval_ewma)
+        self.last_frame_t = now
+        self.frames.append(packets)
+        self.ready.set()
+
+    def _send_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                packets = self.frames.popleft()
+            except IndexError:
+                self.ready.wait(0.1)
+                self.ready.clear()
+                continue
+
+            interval = self.frame_interval or self.interval_ewma
+            gap = interval * self.spread / len(packets) if interval else 0.0
+            t_next = time.monotonic()
+            for packet in packets:
+                if gap >= self.MIN_GAP and not self.frames:
+                    delay = t_next - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    t_next += gap
+                dests = self.dests
+                self._send(packet, dests, 0)
+                self.packets_sent += 1
+                if self.fec is not None:
+                    for parity in self.fec.feed(packet):
+                        self._send(parity, dests, FEC_PORT_OFFSET)
+                        self.fec_sent += 1
+            if self.frames:
+                self.flushed += 1
+            self.frames_sent += 1
+
+    def _send(self, packet, dests, port_offset):
+        for dst in dests:
+            try:
+                self.sock.sendto(packet, (dst[0], dst[1] + port_offset))
+            except OSError:
+                continue  # unreachable receiver must not stall the others
+            counter = self.counters.get(dst)
+            if counter is not None:
+                counter[0] += 1
+                counter[1] += len(packet)
@@ -1,35 +1,194 @@
+import asyncio
 import os
+import queue
 import socket
-import json
-import zmq
+import threading
+import time
+
+from common.msg import DedupeWindow, decode_control, is_control_msg, make_ack
+
+from .control_handler import handle_control_intent
 
 UDP_LISTEN_IP = os.getenv("UDP_LISTEN_IP", "0.0.0.0")
 UDP_LISTEN_PORT = int(os.getenv("UDP_LISTEN_PORT", "9000"))
+# Datagrams read per socket-readable event, and intents buffered for the dispatcher
+UDP_RX_BATCH = int(os.getenv("UDP_RX_BATCH", "64"))
+UDP_RX_QUEUE = int(os.getenv("UDP_RX_QUEUE", "4096"))
+UDP_RX_STATS_INTERVAL = float(os.getenv("UDP_RX_STATS_INTERVAL", "5"))
+# Sequence numbers remembered per GCS session for at-most-once execution, and sessions remembered
+UDP_RX_DEDUPE_WINDOW = int(os.getenv("UDP_RX_DEDUPE_WINDOW", "1024"))
+UDP_RX_DEDUPE_SESSIONS = int(os.getenv("UDP_RX_DEDUPE_SESSIONS", "16"))
+
+
+class IntentStats:
+    """Per intent type, since the last report: count, link latency (GCS t_backend -> receive,
+    needs synced clocks) and dispatch delay (receive -> handler called)."""
+
+    __slots__ = ("count", "link_ms", "link_max", "queue_ms", "queue_max", "errors", "last_error")
 
-class UDPListener:
     def __init__(self):
-        
+        self.count = 0
+        self.link_ms = self.link_max = 0.0
+        self.queue_ms = self.queue_max = 0.0
+        self.errors = 0          # handler raised
+        self.last_error = None
+
+    def add(self, link_ms, queue_ms):
+        self.count += 1
+        if link_ms is not None:
+            self.link_ms += link_ms
+            self.link_max = max(self.link_max, link_ms)
+        self.queue_ms += queue_ms
+        self.queue_max = max(self.queue_max, queue_ms)
+
+    def format(self, elapsed: float) -> str:
+        n = max(self.count, 1)
+        text = (f"{self.count / elapsed:.1f}/s link {self.link_ms / n:.2f}/{self.link_max:.2f} ms "
+                f"dispatch {self.queue_ms / n:.3f}/{self.queue_max:.3f} ms")
+        if self.errors:
+            text += f" errors {self.errors} (last: {self.last_error!r})"
+        return text
+
+
+class UDPListener:
+    """Control intents from the GCS, received on an asyncio loop and dispatched on a thread.
+
+    The socket is non-blocking; each readable event drains up to
+    ``UDP_RX_BATCH`` datagrams straight into a queue, so bursts are read at
+    the rate the kernel delivers them. Decoding (binary or JSON) and
+    ``handle_control_intent`` run on the dispatcher thread, off the receive
+    path. Per-type rate and latency (mean/max) are printed every
+    ``UDP_RX_STATS_INTERVAL`` seconds instead of per packet.
+
+    Sequenced intents (``session``/``seq``, common.msg.control_link) are
+    ACKed to their sender with the receive time, and executed at most once:
+    a retransmitted duplicate is ACKed again but not handled.
+    """
+
+    def __init__(self, ip: str = UDP_LISTEN_IP, port: int = UDP_LISTEN_PORT, handler=handle_control_intent):
+        self.handler = handler
         self.listener_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.listener_socket.bind((UDP_LISTEN_IP, UDP_LISTEN_PORT))
-        print(f"Listening for UDP on port {UDP_LISTEN_PORT}")
+        self.listener_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.listener_socket.bind((ip, port))
+        self.listener_socket.setblocking(False)
+        self.port = self.listener_socket.getsockname()[1]
 
-        import logging
-        logging.basicConfig(level=logging.INFO)
-        self.log = logging.getLogger("gateway")
+        self.intents = queue.Queue(maxsize=UDP_RX_QUEUE)
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.t_report = time.monotonic()
+        self.received = 0
+        self.batches = 0
+        self.dropped = 0     # dispatcher queue full
+        self.bad = 0         # neither a binary control message nor a JSON object
+        self.dedupe = DedupeWindow(UDP_RX_DEDUPE_WINDOW, UDP_RX_DEDUPE_SESSIONS)
+        self.acks = 0
 
-        self.log.info("[GATEWAY] UDP RX ready on %s:%s", UDP_LISTEN_IP, UDP_LISTEN_PORT)
+        self.loop = None
+        self.stopped = None
+        print(f"[RX] UDP control on {ip}:{self.port}")
 
     def listen(self):
+        asyncio.run(self._serve())
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.stopped.set)
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.stopped = asyncio.Event()
+        dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        dispatcher.start()
+        self.loop.add_reader(self.listener_socket, self._read_ready)
+        try:
+            while not self.stopped.is_set():
+                try:
+                    await asyncio.wait_for(self.stopped.wait(), UDP_RX_STATS_INTERVAL)
+                except asyncio.TimeoutError:
+                    self.report()
+        finally:
+            self.loop.remove_reader(self.listener_socket)
+            self.intents.put(None)
+            dispatcher.join()
+            self.listener_socket.close()
+
+    def _read_ready(self):
+        t_rx = time.time()
+        self.batches += 1
+        for _ in range(UDP_RX_BATCH):
+            try:
+                msg, addr = self.listener_socket.recvfrom(65535)
+            except BlockingIOError:
+                return
+            self.received += 1
+            try:
+                self.intents.put_nowait((msg, addr, t_rx))
+            except queue.Full:
+                self.dropped += 1
+
+    def _dispatch_loop(self):
         while True:
-            msg, addr = self.listener_socket.recvfrom(1024)
-            self.log.info("[GATEWAY] UDP recv %s from %s", msg, addr)
-            print(f"Received message from {addr}: {msg}")
+            item = self.intents.get()
+            if item is None:
+                return
+            msg, addr, t_rx = item
             try:
-                data = json.loads(msg.decode('utf-8'))
-                print(f"Control intent received: {data}")
-                # Add logic here to forward intent to control handler
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON: {e}")
+                binary = is_control_msg(msg)
+                intent = decode_control(msg)
+            except Exception:
+                intent = None
+            if intent is None:
+                self.bad += 1
+                continue
+
+            seq = intent.get("seq")
+            if isinstance(seq, int):
+                session = intent.get("session")
+                first = self.dedupe.accept(session, seq, addr)
+                self.ack(make_ack(session, seq, t_rx, not first, binary), addr)
+                if not first:
+                    continue  # retransmit of a command already executed
+
+            now = time.time()
+            error = None
+            try:
+                # Internal topic stays JSON: forward JSON as received, re-encode binary
+                self.handler(intent, None if binary else msg)
+            except Exception as e:
+                error = e  # one bad intent must not stop the dispatcher
+            kind = str(intent.get("type"))
+            t_backend = intent.get("t_backend")
+            link_ms = (t_rx - t_backend) * 1e3 if isinstance(t_backend, (int, float)) else None
+            with self.lock:
+                stats = self.stats.get(kind)
+                if stats is None:
+                    stats = self.stats[kind] = IntentStats()
+                stats.add(link_ms, (now - t_rx) * 1e3)
+                if error is not None:
+                    stats.errors += 1
+                    stats.last_error = error
+
+    def ack(self, packet: bytes, addr):
+        try:
+            self.listener_socket.sendto(packet, addr)
+            self.acks += 1
+        except OSError:
+            pass  # best effort: the sender retransmits and gets another ACK
+
+    def report(self):
+        now = time.monotonic()
+        with self.lock:
+            stats, self.stats = self.stats, {}
+        elapsed = max(now - self.t_report, 1e-9)
+        self.t_report = now
+        if not stats and not self.dropped and not self.bad:
+            return
+        print(f"[RX] received={self.received} batches={self.batches} dropped={self.dropped} bad={self.bad} "
+              f"acks={self.acks} duplicates={self.dedupe.duplicates}")
+        for kind, s in sorted(stats.items()):
+            print(f"[RX]   {kind}: {s.format(elapsed)}")
+
 
 def run():
     listener = UDPListener()
@@ -13,6 +13,7 @@ docker run --rm \
     --env-file "${SCRIPT_DIR}/.env" \
     -e "ZMQ_SUB_ENDPOINT=$(if [ "${FORCE_LOCAL}" = "1" ]; then echo "${LOCAL_ENDPOINT}"; else echo "${ZMQ_SUB_ENDPOINT}"; fi)" \
     -v "${SCRIPT_DIR}:/app" \
+    -v "${SCRIPT_DIR}/../../common:/app/common" \
     --ipc=host \
     --network=host \
     --name "vision-stack-gateway" \
@@ -0,0 +1,88 @@
+"""Micro-benchmark: binary control intents (common/msg/control_msg.py) vs JSON.
+
+Bytes per datagram and encode/decode cost for the intents the GCS sends
+and the gateway's ACK, as they go on the air (sequenced). Intents are built
+like services/gcs/api_process.py builds them (``ControlIntent``) and stamped
+by the publisher's ``AckTracker``:
+
+    python services/gateway/test/bench_control_msg.py --count 200000
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(1, str(REPO_ROOT / "services" / "gcs"))
+
+from common.msg import AckTracker, make_ack, pack_control_msg, unpack_control_msg
+from control_schema import ControlIntent
+
+SESSION = 0x9E3779B9
+NOW = time.time()
+
+# Same types and value formats as the api_process endpoints
+INTENTS = {
+    "HELLO": ControlIntent(type="HELLO", value=1, reliable=True),
+    "RATE_BUDGET": ControlIntent(type="RATE_BUDGET", value=4.5),
+    "ROI": ControlIntent(type="ROI", value="412,188"),
+    "ROI off": ControlIntent(type="ROI", value="off"),
+    "RTP_DEST_ADD": ControlIntent(type="RTP_DEST_ADD", value="192.168.1.51:5010", reliable=True),
+}
+
+
+def sequenced(intent: ControlIntent) -> dict:
+    """The dict udp_publisher encodes: normalized, ``reliable`` popped, session/seq stamped."""
+    msg = dict(intent.normalize())
+    reliable = msg.pop("reliable")
+    tracker = AckTracker(SESSION, binary=False)
+    tracker.next_seq = 42
+    return json.loads(tracker.stamp(msg, reliable))
+
+
+MESSAGES = {kind: sequenced(intent) for kind, intent in INTENTS.items()}
+MESSAGES["ACK"] = json.loads(make_ack(SESSION, 42, NOW, False))
+
+
+def bench(msg, count):
+    t0 = time.perf_counter()
+    for _ in range(count):
+        payload = json.dumps(msg).encode()
+    t_json_enc = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(count):
+        json.loads(payload)
+    t_json_dec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(count):
+        packed = pack_control_msg(msg)
+    t_bin_enc = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(count):
+        decoded = unpack_control_msg(packed, NOW)
+    t_bin_dec = time.perf_counter() - t0
+
+    for key in ("type", "value", "session", "seq"):
+        assert decoded.get(key) == msg.get(key), (key, decoded, msg)
+    return len(payload), len(packed), t_json_enc, t_json_dec, t_bin_enc, t_bin_dec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+    n = args.count
+
+    print(f"{'intent':<13} {'json B':>6} {'bin B':>6} {'json enc/dec us':>16} {'bin enc/dec us':>15}")
+    for kind, msg in MESSAGES.items():
+        size_json, size_bin, je, jd, be, bd = bench(msg, n)
+        print(f"{kind:<13} {size_json:>6} {size_bin:>6} "
+              f"{je / n * 1e6:>7.2f}/{jd / n * 1e6:<8.2f} {be / n * 1e6:>6.2f}/{bd / n * 1e6:<8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Load test for the gateway UDP control receiver (code/udp_rx_process.py).
+
+Runs the receiver in-process with the real handle_control_intent, floods it
+with background intents at --rate packets/s while sending GIMBAL intents at
+--gimbal-hz, and counts what comes out on the gateway.control ZMQ topic:
+
+    python services/gateway/test/control_load_test.py --rate 5000 --seconds 5
+
+Pass: every GIMBAL intent sent is re-published.
+"""
+
+import argparse
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+import sys
+
+UI_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(UI_ROOT))
+sys.path.insert(1, str(UI_ROOT.parent.parent))
+
+# Private control endpoint, set before control_handler reads it
+os.environ["GATEWAY_CONTROL_ENDPOINT"] = f"ipc://{tempfile.mkdtemp()}/control"
+
+import zmq
+
+from code.control_handler import GATEWAY_CONTROL_ENDPOINT, GATEWAY_CONTROL_TOPIC
+from code.udp_rx_process import UDPListener
+
+
+def count_published(sub, counts, stop):
+    while not stop.is_set():
+        if not sub.poll(100):
+            continue
+        _, payload = sub.recv_multipart()
+        kind = json.loads(payload).get("type")
+        counts[kind] = counts.get(kind, 0) + 1
+
+
+def send(port, kind, hz, seconds, sent):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    period = 1.0 / hz
+    t_next = time.monotonic()
+    t_end = t_next + seconds
+    n = 0
+    while t_next < t_end:
+        payload = json.dumps({"type": kind, "value": n, "t_backend": time.time()}).encode()
+        sock.sendto(payload, ("127.0.0.1", port))
+        n += 1
+        t_next += period
+        delay = t_next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    sent[kind] = n
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=5000, help="background intents/s")
+    parser.add_argument("--gimbal-hz", type=float, default=200)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    listener = UDPListener("127.0.0.1", 0)
+    rx_thread = threading.Thread(target=listener.listen, daemon=True)
+    rx_thread.start()
+
+    sub = zmq.Context.instance().socket(zmq.SUB)
+    sub.setsockopt(zmq.RCVHWM, 0)
+    sub.connect(GATEWAY_CONTROL_ENDPOINT)
+    sub.setsockopt(zmq.SUBSCRIBE, GATEWAY_CONTROL_TOPIC)
+    counts = {}
+    stop = threading.Event()
+    counter = threading.Thread(target=count_published, args=(sub, counts, stop), daemon=True)
+    counter.start()
+
+    # PUB binds on the first intent: warm it up so the subscription is in place
+    while "WARMUP" not in counts:
+        send(listener.port, "WARMUP", 100, 0.05, {})
+        time.sleep(0.1)
+
+    sent = {}
+    senders = [
+        threading.Thread(target=send, args=(listener.port, "FLOOD", args.rate, args.seconds, sent)),
+        threading.Thread(target=send, args=(listener.port, "GIMBAL", args.gimbal_hz, args.seconds, sent)),
+    ]
+    t0 = time.monotonic()
+    for t in senders:
+        t.start()
+    for t in senders:
+        t.join()
+    elapsed = time.monotonic() - t0
+    time.sleep(0.5)
+    stop.set()
+    counter.join()
+    listener.report()
+    listener.stop()
+    rx_thread.join()
+
+    print(f"{elapsed:.1f} s, receiver: received={listener.received} batches={listener.batches} "
+          f"dropped={listener.dropped}")
+    for kind in ("FLOOD", "GIMBAL"):
+        print(f"{kind}: sent {sent[kind]} ({sent[kind] / elapsed:.0f}/s), published {counts.get(kind, 0)}")
+    ok = counts.get("GIMBAL", 0) == sent["GIMBAL"]
+    print("PASS" if ok else "FAIL: GIMBAL intents lost")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
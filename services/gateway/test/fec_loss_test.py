@@ -0,0 +1,172 @@
+"""Loopback loss-injection test for the RTP XOR FEC (common/rtp/fec.py).
+
+Sends synthetic RTP "frames" (N packets each, marker on the last) over UDP
+loopback with random packet loss injected at the sender, and counts the
+frames that arrive complete and intact, with and without FEC:
+
+    python services/gateway/test/fec_loss_test.py --loss 1 2 3 5 --k 4 8
+
+Loss applies to parity packets too. A frame counts only if every packet
+arrives, in order, byte-identical.
+
+Before the loopback trials it checks, without sockets, that a group whose
+parity is read before its last RTP packet is still rebuilt (RTP and parity
+come in on separate sockets, so that order happens on a live receiver).
+"""
+
+import argparse
+import os
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from pathlib import Path
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from common.rtp.fec import FecDecoder, FecEncoder
+
+# frame number, packet index, packets in frame
+PAYLOAD_HEAD = struct.Struct("!IHH")
+
+
+def make_frames(frames: int, packets: int, size: int, seed: int):
+    rng = random.Random(seed)
+    seq = rng.randrange(1 << 16)
+    out = []
+    for f in range(frames):
+        frame = []
+        for i in range(packets):
+            marker = 0x80 if i == packets - 1 else 0
+            # Last packet of a JPEG frame is shorter; exercises length recovery
+            n = size if i < packets - 1 else rng.randrange(PAYLOAD_HEAD.size, size)
+            header = struct.pack("!BBHII", 0x80, marker | 26, seq & 0xFFFF, f * 3000, 0x1234)
+            body = PAYLOAD_HEAD.pack(f, i, packets) + os.urandom(n - PAYLOAD_HEAD.size)
+            frame.append(header + body)
+            seq += 1
+        out.append(frame)
+    return out
+
+
+def receive(sock_rtp, sock_fec, decoder, got, stop):
+    while not stop.is_set():
+        ready, _, _ = select.select([sock_rtp, sock_fec], [], [], 0.05)
+        for s in ready:
+            data = s.recv(65536)
+            if decoder is None:
+                got.append(data)
+            elif s is sock_rtp:
+                got.extend(decoder.on_rtp(data))
+            else:
+                got.extend(decoder.on_fec(data))
+
+
+def complete_frames(sent, got):
+    """Frames whose packets all arrived in order and intact."""
+    expected = {p: (f, i) for f, frame in enumerate(sent) for i, p in enumerate(frame)}
+    ok = 0
+    frame, next_index = None, 0
+    for packet in got:
+        f, i = expected.get(packet, (None, None))   # None: corrupted rebuild
+        if f is not None and f == frame and i == next_index:
+            next_index += 1
+        elif i == 0:
+            frame, next_index = f, 1
+        else:
+            frame = None
+            continue
+        if next_index == len(sent[frame]):
+            ok += 1
+            frame = None
+    return ok
+
+
+def check_parity_before_last_packet(size: int, seed: int):
+    frame = make_frames(1, 4, size, seed)[0]
+    encoder = FecEncoder(4)
+    parity = [p for packet in frame for p in encoder.feed(packet)]
+    decoder = FecDecoder()
+    got = decoder.on_rtp(frame[0])
+    got += decoder.on_rtp(frame[2])      # frame[1] lost
+    got += decoder.on_fec(parity[0])     # parity read before frame[3]
+    got += decoder.on_rtp(frame[3])
+    assert got == frame, "packet lost before its group's parity was not rebuilt"
+    assert (decoder.recovered, decoder.lost) == (1, 0), (decoder.recovered, decoder.lost)
+    print("parity before the group's last packet: rebuilt")
+
+
+def trial(frames, loss: float, k: int, port: int, rate_pps: int, seed: int):
+    rng = random.Random(seed + 1)
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx_rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx_fec = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for s in (rx_rtp, rx_fec):
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+    rx_rtp.bind(("127.0.0.1", port))
+    rx_fec.bind(("127.0.0.1", port + 4))
+
+    encoder = FecEncoder(k) if k else None
+    decoder = FecDecoder() if k else None
+    got = []
+    stop = threading.Event()
+    thread = threading.Thread(target=receive, args=(rx_rtp, rx_fec, decoder, got, stop), daemon=True)
+    thread.start()
+
+    sent_packets = dropped = 0
+    gap = 1.0 / rate_pps
+    t_next = time.monotonic()
+    for frame in frames:
+        for packet in frame:
+            out = [(packet, port)]
+            if encoder is not None:
+                out += [(fec, port + 4) for fec in encoder.feed(packet)]
+            for data, dst_port in out:
+                sent_packets += 1
+                if rng.random() < loss:
+                    dropped += 1
+                    continue
+                tx.sendto(data, ("127.0.0.1", dst_port))
+                t_next += gap
+                delay = t_next - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+    time.sleep(0.2)
+    stop.set()
+    thread.join()
+    for s in (tx, rx_rtp, rx_fec):
+        s.close()
+    return complete_frames(frames, got), sent_packets, dropped, decoder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--packets", type=int, default=40, help="RTP packets per frame (~55 KB JPEG)")
+    parser.add_argument("--size", type=int, default=1400)
+    parser.add_argument("--loss", type=float, nargs="+", default=[1, 2, 3, 5], help="packet loss, percent")
+    parser.add_argument("--k", type=int, nargs="+", default=[4, 8], help="FEC group sizes to compare")
+    parser.add_argument("--rate", type=int, default=20000, help="packets/s on loopback")
+    parser.add_argument("--port", type=int, default=15004)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    check_parity_before_last_packet(args.size, args.seed)
+    frames = make_frames(args.frames, args.packets, args.size, args.seed)
+    print(f"{args.frames} frames x {args.packets} packets")
+    print(f"{'loss %':>6} {'FEC k':>6} {'overhead':>8} {'frames ok':>10} {'dropped':>8} {'recovered':>9} {'lost':>5}")
+    for loss in args.loss:
+        for k in [0] + args.k:
+            ok, sent, dropped, decoder = trial(frames, loss / 100, k, args.port, args.rate, args.seed)
+            overhead = f"{100 / k:.0f}%" if k else "-"
+            recovered = decoder.recovered if decoder else "-"
+            lost = decoder.lost if decoder else "-"
+            print(f"{loss:>6.1f} {k or '-':>6} {overhead:>8} {ok:>6}/{args.frames:<3} {dropped:>8} {recovered:>9} {lost:>5}")
+
+
+if __name__ == "__main__":
+    main()
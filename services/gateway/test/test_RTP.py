@@ -7,6 +7,7 @@ import signal
 
 UI_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(UI_ROOT))
+sys.path.insert(1, str(UI_ROOT.parent.parent))
 
 from code.host_RTP import *
 from usb_cam_to_shm import USB_Camera
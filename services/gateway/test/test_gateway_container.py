@@ -8,6 +8,7 @@ import sys
 
 UI_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(UI_ROOT))
+sys.path.insert(1, str(UI_ROOT.parent.parent))
 
 from code.host_RTP import HostRTP
 from usb_cam_to_shm import USB_Camera
@@ -1,9 +1,11 @@
+import time
 import zmq
 import threading
-from multiprocessing import shared_memory
-import numpy as np
 import cv2
 
+from common.msg import encode_shm_name, frame_topic, pack_frame_msg, send_frame_msg
+from common.shm import FrameRingWriter
+
 class Camera:
     frame_id_counter=0
     def __init__(self):
@@ -14,87 +16,37 @@ class Camera:
         self.context = zmq.Context()
         self.socket = self.context.socket(zmq.PUB)
         self.socket.bind("tcp://*:5555")  # ZeroMQ PUB socket
+        self.topic = frame_topic("cam0")
 
         self.exit_flag = threading.Event()  # For signaling thread to stop
         self.capture_thread = threading.Thread(target=self.capture_frames)  # Create the capture thread
 
     def setup_shm(self):
         self.shm_name = "frame_shm"
-        self.max_width = 7680
-        self.max_height = 4320
-        self.channels = 3
-    
-        # ---- sizes ----
-        self.pixel_bytes = self.max_width * self.max_height * self.channels
-        self.meta_bytes  = 32  # seq + dims + future-proof padding
-        self.shm_size    = self.pixel_bytes + self.meta_bytes
-    
-        try:
-            self.shm = shared_memory.SharedMemory(
-                create=True,
-                name=self.shm_name,
-                size=self.shm_size,
-            )
-        except FileExistsError:
-            old = shared_memory.SharedMemory(name=self.shm_name)
-            old.unlink()
-            old.close()
-            self.shm = shared_memory.SharedMemory(
-                create=True,
-                name=self.shm_name,
-                size=self.shm_size,
-            )
-    
-        buf = self.shm.buf
-    
-        # ---- pixel buffer (STABLE OFFSET) ----
-        self.frame_buf = np.ndarray(
-            (self.max_height, self.max_width, self.channels),
-            dtype=np.uint8,
-            buffer=buf[:self.pixel_bytes],
-        )
-    
-        # ---- metadata (AFTER pixels) ----
-        meta_offset = self.pixel_bytes
-    
-        self.seq = np.ndarray(
-            (1,),
-            dtype=np.uint64,
-            buffer=buf,
-            offset=meta_offset,
-        )
-    
-        self.meta = np.ndarray(
-            (3,),  # width, height, channels
-            dtype=np.uint32,
-            buffer=buf,
-            offset=meta_offset + 8,
-        )
-    
-        # initialize
-        self.seq[0] = 0
+        self.shm_slots = 4
+
+        # Same ring layout the camera service writes; see common/shm/frame_ring.py
+        self.ring_writer = FrameRingWriter(self.shm_name, self.shm_slots)
+        self.shm_name_field = encode_shm_name(self.shm_name)
 
     def capture_frame(self):
         """To be implemented by child classes. Capture frame from camera."""
         raise NotImplementedError("capture_frame() must be implemented in child class")
 
 
-    def write_frame_to_shared_memory(self, frame):
-        """Write the captured frame into shared memory. Use seq to detect tearing"""
-        h, w, c = frame.shape
-    
-        self.seq[0] += 1              # write start (odd)
-        self.meta[:] = (w, h, self.channels)
-        self.frame_buf[:h, :w, :c] = frame
-        self.seq[0] += 1              # write complete (even)
+    def write_frame_to_shared_memory(self, frame, t_capture_ns=0):
+        """Write the captured frame into the next ring slot. Returns the slot index."""
+        return self.ring_writer.write(frame, self.frame_id_counter, t_capture_ns)
 
     def capture_frames(self):
         """Main loop to capture frames continuously, write to shared memory, and send ZeroMQ notifications."""
         while not self.exit_flag.is_set():  # Check the exit flag to stop the thread
             ok, frame_bgr = self.capture_frame()  # Capture a frame (implementation in child class)
             if ok and frame_bgr is not None:
-                self.write_frame_to_shared_memory(frame_bgr)
-                self.send_frame_metadata(frame_bgr)
+                t_capture_ns = time.monotonic_ns()
+                self.frame_id_counter += 1
+                slot = self.write_frame_to_shared_memory(frame_bgr, t_capture_ns)
+                self.send_frame_metadata(slot, t_capture_ns)
 
     def start_capture(self):
         """Start the capture thread."""
@@ -106,29 +58,29 @@ class Camera:
         self.exit_flag.set()  # Signal the thread to stop
         self.capture_thread.join()  # Wait for the thread to finish
         
-        try:
-            self.shm.close()
-            self.shm.unlink()
-        except Exception:
-            pass
+        self.ring_writer.close()
 
         self.socket.close()
         self.context.term()
 
-    def send_frame_metadata(self, frame):
-        h, w, c = frame.shape
-    
-        self.frame_id_counter += 1
-    
-        msg = {
-            "shm_name": self.shm_name,
-            "width": w,
-            "height": h,
-            "channels": c,
-            "frame_id": self.frame_id_counter,
-        }
-    
-        self.socket.send_json(msg)            
+    def send_frame_metadata(self, slot, t_capture_ns):
+        """Publish the fixed-layout binary notification for the slot just committed."""
+        ring = self.ring_writer.ring
+        payload = pack_frame_msg(
+            ring.pixfmt,
+            slot,
+            ring.generation,
+            self.frame_id_counter,
+            t_capture_ns,
+            0,
+            ring.width,
+            ring.height,
+            ring.channels,
+            ring.stride,
+            ring.height * ring.stride,
+            self.shm_name_field,
+        )
+        send_frame_msg(self.socket, self.topic, payload)            
 
 
 class USB_Camera(Camera):
@@ -18,6 +18,20 @@ class HelloReq(BaseModel):
     value: Optional[int] = 1
 
 
+class RateBudgetReq(BaseModel):
+    mbps: float  # 0 disables the gateway's rate controller
+
+
+class RtpDestReq(BaseModel):
+    host: str
+    port: Optional[int] = None  # gateway's RTP_PORT if omitted
+
+
+class RoiReq(BaseModel):
+    x: Optional[float] = None  # camera pixels; omit both to turn ROI mode off
+    y: Optional[float] = None
+
+
 def run():
     ctx = zmq.Context()
     sock = ctx.socket(zmq.PUSH)
@@ -31,7 +45,37 @@ def run():
         log = logging.getLogger("api")
         logging.basicConfig(level=logging.INFO)
         log.info("[API] handler entered")        
-        intent = ControlIntent(type="HELLO", value=req.value)
+        intent = ControlIntent(type="HELLO", value=req.value, reliable=True)
+        sock.send_json(intent.normalize())
+        return {"status": "sent"}
+
+    @app.post("/control/rate_budget")
+    def rate_budget(req: RateBudgetReq):
+        # Video link budget for the gateway's adaptive quality/resolution/frame-rate control
+        intent = ControlIntent(type="RATE_BUDGET", value=req.mbps)
+        sock.send_json(intent.normalize())
+        return {"status": "sent"}
+
+    @app.post("/control/roi")
+    def roi(req: RoiReq):
+        # Native-resolution crop centred on (x, y) plus a low-res context frame
+        value = "off" if req.x is None or req.y is None else f"{req.x:.0f},{req.y:.0f}"
+        intent = ControlIntent(type="ROI", value=value)
+        sock.send_json(intent.normalize())
+        return {"status": "sent"}
+
+    @app.post("/control/rtp_dest/add")
+    def rtp_dest_add(req: RtpDestReq):
+        # Another unicast receiver of the same encoded stream
+        value = req.host if req.port is None else f"{req.host}:{req.port}"
+        intent = ControlIntent(type="RTP_DEST_ADD", value=value, reliable=True)
+        sock.send_json(intent.normalize())
+        return {"status": "sent"}
+
+    @app.post("/control/rtp_dest/remove")
+    def rtp_dest_remove(req: RtpDestReq):
+        value = req.host if req.port is None else f"{req.host}:{req.port}"
+        intent = ControlIntent(type="RTP_DEST_REMOVE", value=value, reliable=True)
         sock.send_json(intent.normalize())
         return {"status": "sent"}
 
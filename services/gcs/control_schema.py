@@ -8,8 +8,10 @@ import time
 @dataclass
 class ControlIntent:
     type: str
-    value: Union[str, int, None] = None
+    value: Union[str, int, float, None] = None
     t_backend: Optional[float] = None
+    # Non-idempotent: the publisher retransmits until ACKed. Latest-wins intents are sent once
+    reliable: bool = False
 
     def normalize(self):
         self.t_backend = time.time()
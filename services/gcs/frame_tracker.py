@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import NamedTuple, Optional
+
+from common.rtp import FrameMeta
+
+
+class DisplayedFrame(NamedTuple):
+    meta: FrameMeta
+    age_ms: Optional[float]     # capture -> decoded, across hosts (needs synced clocks)
+    meta_lag_ms: float          # FrameMeta arrival -> decoded, local clock only
+
+
+class FrameTracker:
+    """Joins decoded frames to the gateway's FrameMeta datagrams by RTP timestamp.
+
+    The RTP timestamp is gone after depayloading, but the decoders keep the
+    buffer PTS. A probe on the depayloader's sink pad records RTP timestamp
+    by packet PTS (``on_packet``); a decoded frame's PTS is one of its
+    packets', so ``on_frame(pts)`` finds its RTP timestamp and from that its
+    FrameMeta.
+
+    Loss: the stream is in order, so when a frame is displayed, every meta
+    for an earlier frame_id still pending was never decoded. frame_ids the
+    gateway never sent (decimation) have no meta and are not counted.
+    """
+
+    MAX_PACKETS = 8192   # pts -> rtp_ts entries kept
+    MAX_PENDING = 1024   # metas waiting for their frame
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.packet_ts = OrderedDict()    # packet PTS -> RTP timestamp
+        self.pending = OrderedDict()      # RTP timestamp -> (FrameMeta, arrival monotonic ns)
+        self.latest = None                # DisplayedFrame
+        self.recent_lost = deque(maxlen=32)
+
+        self.metas = 0
+        self.displayed = 0
+        self.lost = 0
+        self.unmatched = 0                # decoded frames with no meta (meta lost, or gateway restarted)
+
+    def on_packet(self, pts: int, rtp_ts: int):
+        with self.lock:
+            self.packet_ts[pts] = rtp_ts
+            if len(self.packet_ts) > self.MAX_PACKETS:
+                self.packet_ts.popitem(last=False)
+
+    def on_meta(self, meta: FrameMeta):
+        with self.lock:
+            self.metas += 1
+            self.pending[meta.rtp_ts] = (meta, time.monotonic_ns())
+            if len(self.pending) > self.MAX_PENDING:
+                old, _ = self.pending.popitem(last=False)[1]
+                self._lose(old)
+
+    def on_frame(self, pts: int) -> Optional[DisplayedFrame]:
+        """Called per decoded frame; returns its identity and age, or None if it has no meta."""
+        now_unix = time.time_ns()
+        now = time.monotonic_ns()
+        with self.lock:
+            rtp_ts = self.packet_ts.get(pts)
+            entry = self.pending.pop(rtp_ts, None) if rtp_ts is not None else None
+            if entry is None:
+                self.unmatched += 1
+                return None
+            meta, t_arrival = entry
+
+            for ts in [ts for ts, (m, _) in self.pending.items() if m.frame_id < meta.frame_id]:
+                self._lose(self.pending.pop(ts)[0])
+
+            self.displayed += 1
+            age = (now_unix - meta.t_capture_unix_ns) / 1e6 if meta.t_capture_unix_ns else None
+            self.latest = DisplayedFrame(meta, age, (now - t_arrival) / 1e6)
+            return self.latest
+
+    def _lose(self, meta: FrameMeta):
+        self.lost += 1
+        self.recent_lost.append(meta.frame_id)
+
+    def stats(self) -> dict:
+        with self.lock:
+            latest = self.latest
+            result = {
+                "metas": self.metas,
+                "displayed": self.displayed,
+                "lost": self.lost,
+                "unmatched": self.unmatched,
+                "recent_lost": list(self.recent_lost),
+            }
+        if latest is not None:
+            result.update(
+                frame_id=latest.meta.frame_id,
+                age_ms=None if latest.age_ms is None else round(latest.age_ms, 2),
+                meta_lag_ms=round(latest.meta_lag_ms, 2),
+            )
+        return result
@@ -8,5 +8,6 @@ docker run --rm -it \
   --network host \
   --env-file ${ENV_FILE} \
   -v $(pwd):/app \
+  -v $(pwd)/../../common:/app/common \
   ${IMAGE_NAME} \
   python run_gcs.py
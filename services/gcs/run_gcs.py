@@ -1,4 +1,10 @@
 import multiprocessing as mp
+import sys
+from pathlib import Path
+
+# common/ lives at the repo root, or is mounted at /app/common in the container
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent.parent))
+
 from video_process import run as video_run
 from api_process import run as api_run
 from udp_publisher import run as udp_run
@@ -1,5 +1,7 @@
 import threading
 import os
+import sys
+from pathlib import Path
 
 import numpy as np
 import cv2
@@ -12,11 +14,17 @@ import gi
 gi.require_version("Gst", "1.0")
 from gi.repository import Gst
 
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent.parent))
+from common.rtp import receiver_pipeline
+
 # -----------------------------
 # Configuration
 # -----------------------------
 RTP_PORT = int(os.getenv("RTP_PORT", "5004"))
+RTP_CODEC = os.getenv("RTP_CODEC", "jpeg")
 GCS_HTTP_PORT = int(os.getenv("VID_HTTP_PORT", "8000"))
+# Serve the received JPEG bytes without decode/re-encode (jpeg codec only)
+GCS_JPEG_PASSTHROUGH = os.getenv("GCS_JPEG_PASSTHROUGH", "1") != "0" and RTP_CODEC == "jpeg"
 # -----------------------------
 # Global frame storage
 # -----------------------------
@@ -31,12 +39,7 @@ def gst_receive_loop():
 
     Gst.init(None)
 
-    pipeline_str = (
-        f"udpsrc port={RTP_PORT} caps=application/x-rtp,media=video,encoding-name=JPEG,payload=26 ! "
-        f"rtpjpegdepay ! jpegdec ! "
-        f"videoconvert ! video/x-raw, format=BGR, width=1280, height=720 ! "
-        f"appsink name=sink"
-    )
+    pipeline_str = receiver_pipeline(RTP_CODEC, RTP_PORT, "appsink name=sink", decode=not GCS_JPEG_PASSTHROUGH)
     
     pipeline = Gst.parse_launch(pipeline_str)
     appsink = pipeline.get_by_name("sink")
@@ -50,6 +53,12 @@ def gst_receive_loop():
             continue
 
         buf = sample.get_buffer()
+        if GCS_JPEG_PASSTHROUGH:
+            jpeg = buf.extract_dup(0, buf.get_size())
+            with frame_lock:
+                latest_jpeg = jpeg
+            continue
+
         caps = sample.get_caps().get_structure(0)
         w = caps.get_value("width")
         h = caps.get_value("height")
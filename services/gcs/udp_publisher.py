@@ -1,24 +1,83 @@
 import os
 import zmq
 import socket
-import json
-import logging
+import random
+import time
+
+from common.msg import ACK_TYPE, AckTracker, decode_control
+
 ZMQ_PULL = os.getenv("ZMQ_CONTROL")
 UDP_DST_IP = os.getenv("UDP_DST_IP")
 UDP_DST_PORT = int(os.getenv("UDP_DST_PORT"))
+# Reliable intents: sends per command (first + retransmits) and RTO bounds, seconds
+CONTROL_MAX_TRIES = int(os.getenv("CONTROL_MAX_TRIES", "5"))
+CONTROL_MIN_RTO = float(os.getenv("CONTROL_MIN_RTO", "0.05"))
+CONTROL_MAX_RTO = float(os.getenv("CONTROL_MAX_RTO", "1.0"))
+CONTROL_STATS_INTERVAL = float(os.getenv("CONTROL_STATS_INTERVAL", "5"))
+# binary (common.msg.control_msg, ~20 B/intent) | json (readable, ~100 B)
+CONTROL_WIRE = os.getenv("CONTROL_WIRE", "binary")
+
+
+def report(tracker, send_errors):
+    print(f"[UDP] sent={tracker.sent} acked={tracker.acked} retransmits={tracker.retransmits} "
+          f"failed={tracker.failed} unacked={tracker.unacked} pending={len(tracker.pending)} "
+          f"send_errors={send_errors} rto={tracker.rto * 1e3:.0f} ms")
+    for kind, stats in sorted(tracker.rtt.items()):
+        print(f"[UDP]   {kind}: {stats.format()}")
+
 
 def run():
     ctx = zmq.Context()
     sock = ctx.socket(zmq.PULL)
     sock.connect(ZMQ_PULL)
 
+    # Intents out, ACKs back on the same socket
     udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    log = logging.getLogger("api")
-    logging.basicConfig(level=logging.INFO)
+    udp.setblocking(False)
+    dst = (UDP_DST_IP, UDP_DST_PORT)
+
+    tracker = AckTracker(random.getrandbits(32), CONTROL_MIN_RTO, CONTROL_MAX_RTO, CONTROL_MAX_TRIES,
+                         binary=CONTROL_WIRE != "json")
+    poller = zmq.Poller()
+    poller.register(sock, zmq.POLLIN)
+    poller.register(udp, zmq.POLLIN)
+    t_report = time.monotonic() + CONTROL_STATS_INTERVAL
+    reported = 0
+    send_errors = 0
+
+    def send(payload):
+        # Socket buffer full or no route: the intent stays pending, so reliable ones are resent
+        nonlocal send_errors
+        try:
+            udp.sendto(payload, dst)
+        except OSError:
+            send_errors += 1
+
     while True:
-        msg = sock.recv_json()
-        log.info("[UDP_PUB] recv from ZMQ: %s", msg)
-        log.info("[UDP_PUB] sendto %s:%d", UDP_DST_IP, UDP_DST_PORT)
-        payload = json.dumps(msg).encode()
-        udp.sendto(payload, (UDP_DST_IP, UDP_DST_PORT))
-        print(f"[UDP] sent {msg}")
+        now = time.monotonic()
+        deadline = min(tracker.next_deadline() or t_report, t_report)
+        events = dict(poller.poll(max(deadline - now, 0) * 1000))
+
+        if sock in events:
+            msg = sock.recv_json()
+            reliable = bool(msg.pop("reliable", False))
+            send(tracker.stamp(msg, reliable))
+
+        if udp in events:
+            while True:
+                try:
+                    data = udp.recv(2048)
+                except OSError:
+                    break  # drained (BlockingIOError), or an ICMP error queued on the socket
+                ack = decode_control(data)
+                if ack is not None and ack.get("type") == ACK_TYPE:
+                    tracker.on_ack(ack)
+
+        for payload in tracker.due():
+            send(payload)
+
+        if time.monotonic() >= t_report:
+            if tracker.sent != reported:
+                report(tracker, send_errors)
+                reported = tracker.sent
+            t_report = time.monotonic() + CONTROL_STATS_INTERVAL
@@ -1,5 +1,7 @@
 import threading
 import os
+import select
+import socket
 import numpy as np
 import cv2
 from fastapi import FastAPI
@@ -11,22 +13,99 @@ import gi
 gi.require_version("Gst", "1.0")
 from gi.repository import Gst
 
+from common.rtp import FEC_PORT_OFFSET, META_PORT_OFFSET, FecDecoder, receiver_pipeline, unpack_frame_meta
+from frame_tracker import FrameTracker
+
 RTP_PORT = int(os.getenv("RTP_PORT", "5004"))
+RTP_CODEC = os.getenv("RTP_CODEC", "jpeg")  # must match the gateway
 VIDEO_HTTP_PORT = int(os.getenv("VIDEO_HTTP_PORT", "8000"))
+# The gateway sends per-frame meta to RTP_PORT + META_PORT_OFFSET; override only behind port mapping
+RTP_META_PORT = int(os.getenv("RTP_META_PORT", str(RTP_PORT + META_PORT_OFFSET)))
+# Receive RTP in Python and rebuild lost packets from the gateway's parity (RTP_FEC_K there)
+RTP_FEC = os.getenv("RTP_FEC", "0") != "0"
+# Serve the gateway's JPEG bytes as received; pixels are decoded only when latest_bgr() is called
+GCS_JPEG_PASSTHROUGH = os.getenv("GCS_JPEG_PASSTHROUGH", "1") != "0" and RTP_CODEC == "jpeg"
 
 latest_jpeg = None
+latest_frame = None  # DisplayedFrame (frame_id, age, ROI geometry) of latest_jpeg
+latest_pixels = None  # BGR of latest_jpeg when the pipeline decodes (H.26x, or passthrough off)
 lock = threading.Lock()
+decode_lock = threading.Lock()
+decoded = (None, None)  # (jpeg bytes, BGR) of the last lazy decode
+video_stats = {"frames": 0, "decodes": 0}
+tracker = FrameTracker()
+fec = FecDecoder() if RTP_FEC else None
+
+
+def frame_meta_loop():
+    """Per-frame identity/capture time (and ROI geometry) from the gateway, joined in gst_loop."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("0.0.0.0", RTP_META_PORT))
+    while True:
+        payload, _ = sock.recvfrom(2048)
+        try:
+            meta = unpack_frame_meta(payload)
+        except ValueError:
+            continue
+        tracker.on_meta(meta)
+
+
+def on_rtp_packet(pad, info):
+    """Depayloader sink probe: remember each packet's RTP timestamp by its PTS."""
+    bufs = info.get_buffer_list()
+    bufs = [bufs.get(i) for i in range(bufs.length())] if bufs is not None else [info.get_buffer()]
+    for buf in bufs:
+        if buf is not None and buf.get_size() >= 8:
+            tracker.on_packet(buf.pts, int.from_bytes(buf.extract_dup(4, 4), "big"))
+    return Gst.PadProbeReturn.OK
+
+
+def fec_receive_loop(appsrc):
+    """RTP + parity sockets -> FecDecoder -> in-order RTP packets into the pipeline's appsrc."""
+    rtp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtp_sock.bind(("0.0.0.0", RTP_PORT))
+    fec_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    fec_sock.bind(("0.0.0.0", RTP_PORT + FEC_PORT_OFFSET))
+    while True:
+        ready, _, _ = select.select([rtp_sock, fec_sock], [], [])
+        for sock in ready:
+            data = sock.recv(65536)
+            packets = fec.on_rtp(data) if sock is rtp_sock else fec.on_fec(data)
+            for packet in packets:
+                appsrc.emit("push-buffer", Gst.Buffer.new_wrapped(packet))
+
+
+def latest_bgr():
+    """BGR pixels of the frame /frame.jpg currently serves, for overlay/analysis consumers.
+
+    In passthrough mode the JPEG is decoded here, at most once per frame, and
+    only if someone asks; otherwise the pipeline's decoded frame is returned.
+    Callers must not modify the array.
+    """
+    global decoded
+    with lock:
+        jpeg, pixels = latest_jpeg, latest_pixels
+    if pixels is not None or jpeg is None:
+        return pixels
+    with decode_lock:
+        if decoded[0] is not jpeg:
+            decoded = (jpeg, cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR))
+            video_stats["decodes"] += 1
+        return decoded[1]
+
 
 def gst_loop():
-    global latest_jpeg
+    global latest_jpeg, latest_frame, latest_pixels
     Gst.init(None)
 
-    pipeline = Gst.parse_launch(
-        f"udpsrc port={RTP_PORT} caps=application/x-rtp,media=video,encoding-name=JPEG,payload=26 ! "
-        f"rtpjpegdepay ! jpegdec ! videoconvert ! video/x-raw,format=BGR ! appsink name=sink"
-    )
+    pipeline = Gst.parse_launch(receiver_pipeline(RTP_CODEC, RTP_PORT, "appsink name=sink",
+                                                  appsrc=RTP_FEC, decode=not GCS_JPEG_PASSTHROUGH))
     sink = pipeline.get_by_name("sink")
+    pipeline.get_by_name("depay").get_static_pad("sink").add_probe(
+        Gst.PadProbeType.BUFFER | Gst.PadProbeType.BUFFER_LIST, on_rtp_packet)
     pipeline.set_state(Gst.State.PLAYING)
+    if RTP_FEC:
+        threading.Thread(target=fec_receive_loop, args=(pipeline.get_by_name("rtpsrc"),), daemon=True).start()
 
     while True:
         sample = sink.emit("try-pull-sample", 1_000_000_000)
@@ -34,6 +113,15 @@ def gst_loop():
             continue
 
         buf = sample.get_buffer()
+        shown = tracker.on_frame(buf.pts)
+        video_stats["frames"] += 1
+        if GCS_JPEG_PASSTHROUGH:
+            jpeg = buf.extract_dup(0, buf.get_size())
+            with lock:
+                latest_jpeg = jpeg
+                latest_frame = shown
+            continue
+
         caps = sample.get_caps().get_structure(0)
         w, h = caps.get_value("width"), caps.get_value("height")
 
@@ -48,9 +136,12 @@ def gst_loop():
         if ok:
             with lock:
                 latest_jpeg = jpg.tobytes()
+                latest_frame = shown
+                latest_pixels = frame
 
 def run():
     threading.Thread(target=gst_loop, daemon=True).start()
+    threading.Thread(target=frame_meta_loop, daemon=True).start()
 
     app = FastAPI()
 
@@ -61,8 +152,32 @@ def run():
     @app.get("/frame.jpg")
     def frame():
         with lock:
-            if latest_jpeg is None:
-                return Response(status_code=204)
-            return Response(latest_jpeg, media_type="image/jpeg")
+            jpeg, shown = latest_jpeg, latest_frame
+        if jpeg is None:
+            return Response(status_code=204)
+        headers = {}
+        if shown is not None:
+            headers["X-Frame-Id"] = str(shown.meta.frame_id)
+            if shown.age_ms is not None:
+                headers["X-Frame-Age-Ms"] = f"{shown.age_ms:.1f}"
+        return Response(jpeg, media_type="image/jpeg", headers=headers)
+
+    @app.get("/frame_stats.json")
+    def frame_stats():
+        # Age of the displayed frame and per-frame_id loss since start
+        stats = tracker.stats()
+        stats["video"] = dict(video_stats, mode="passthrough" if GCS_JPEG_PASSTHROUGH else "decode")
+        if fec is not None:
+            stats["fec"] = {"received": fec.received, "parity": fec.fec_received,
+                            "recovered": fec.recovered, "lost": fec.lost}
+        return stats
+
+    @app.get("/roi.json")
+    def roi():
+        # Where the crop and context sit in /frame.jpg, in camera pixels; {} outside ROI mode
+        with lock:
+            shown = latest_frame
+        roi = shown.meta.roi if shown is not None else None
+        return {} if roi is None else roi._asdict()
 
     uvicorn.run(app, host="0.0.0.0", port=VIDEO_HTTP_PORT)